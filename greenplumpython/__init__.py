@@ -1,10 +1,11 @@
 from greenplumpython import config
 from greenplumpython.dataframe import DataFrame
 from greenplumpython.db import Database, database
-from greenplumpython.expr import Expr
+from greenplumpython.expr import Expr, parameter
 from greenplumpython.func import create_aggregate  # type: ignore
 from greenplumpython.func import create_column_function  # type: ignore
 from greenplumpython.func import create_function  # type: ignore
+from greenplumpython.func import create_vectorized_function  # type: ignore
 from greenplumpython.func import aggregate_function, function
 from greenplumpython.op import operator
-from greenplumpython.type import type_
+from greenplumpython.type import packed_array, type_
@@ -1,6 +1,38 @@
 """Global configurations for GreenplumPython."""
+from typing import Optional
 
 print_sql: bool = False
 """
 Enable this to display the SQL query sent by GreenplumPython to Database behind each command.
 """
+
+prepared_statement_cache_size: int = 128
+"""
+Maximum number of prepared statements kept by each :class:`~db.Database` for
+parameterized :class:`~dataframe.DataFrame`. The least recently used statement is
+deallocated when the limit is exceeded.
+"""
+
+catalog_cache_ttl: Optional[float] = 60.0
+"""
+Number of seconds for which metadata read from the system catalogs, such as
+the columns of a table, is cached in each :class:`~db.Database`. Set it to
+:code:`None` to cache until invalidated by :meth:`~db.Database.invalidate_cache`,
+or to :code:`0` to disable the cache.
+"""
+
+udf_object_size_threshold: int = 64 * 1024
+"""
+Minimum size in bytes of the pickle of an object, e.g. a fitted model,
+captured by a UDF for it to be stored separately in database. Such an object
+is stored only once for all UDFs capturing it, and is loaded by each session
+only when one of them is called.
+"""
+
+embedding_pre_filter_selectivity: float = 0.1
+"""
+Maximum estimated fraction of rows satisfying the predicate of a filtered
+:meth:`~experimental.embedding.Embedding.search` for the rows to be filtered
+before searching exactly among them. Otherwise, the vector index is scanned for
+more candidates than requested, which are then filtered.
+"""
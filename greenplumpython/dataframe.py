@@ -25,7 +25,9 @@ in that:
   is similar to the :code:`REFRESH MATERIALIZED VIEW` `command in PostgreSQL
   <https://www.postgresql.org/docs/current/sql-refreshmaterializedview.html>`_ for syncing updates.
 """
+import copy
 import json
+import os
 import sys
 from collections import abc
 from functools import partialmethod, singledispatchmethod
@@ -54,12 +56,38 @@ from uuid import uuid4
 from psycopg2.extras import RealDictRow
 
 from greenplumpython.col import Column, Expr
-from greenplumpython.db import Database
+from greenplumpython.db import (
+    _PARAMETER_PATTERN,
+    Database,
+    _canonical_cte_names,
+    _parameter_names,
+)
 from greenplumpython.expr import _serialize_to_expr
 from greenplumpython.group import DataFrameGroupingSet
 from greenplumpython.order import DataFrameOrdering
+from greenplumpython.plan import Plan, Profile, ProfileStep
 from greenplumpython.row import Row
 
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _caller() -> Tuple[Optional[str], Optional[str]]:
+    # noqa: D400
+    """
+    :meta private:
+
+    Return the name of the method called by the user to create a
+    :class:`~dataframe.DataFrame`, and the location in user's code calling it.
+    """
+    operation: Optional[str] = None
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+        operation = frame.f_code.co_name
+        frame = frame.f_back
+    if frame is None:
+        return operation, None
+    return operation, f"{frame.f_code.co_filename}:{frame.f_lineno}"
+
 
 class DataFrame:
     """Representation of GreenplumPython DataFrame object."""
@@ -80,6 +108,17 @@ class DataFrame:
         self._qualified_table_name = qualified_table_name
         self._columns = columns
         self._contents: Optional[Iterable[RealDictRow]] = None
+        self._parameters: Dict[str, Any] = {}
+        # Configuration parameters set only while the query is executed.
+        self._settings: Dict[str, Any] = {}
+        # Names and types of the columns, inferred lazily and cached.
+        self._schema: Optional[Dict[str, str]] = None
+        # Derives the schema from that of the only parent without querying,
+        # if the columns are known to be a subset of the parent's.
+        self._schema_from_parent: Optional[Callable[[Dict[str, str]], Optional[Dict[str, str]]]] = (
+            None
+        )
+        self._operation, self._call_site = _caller()
         if any(parents):
             self._db = next(iter(parents))._db
         else:
@@ -101,13 +140,19 @@ class DataFrame:
     @_getitem.register(list)
     def _(self, column_names: List[str]) -> "DataFrame":
         targets_str = [_serialize_to_expr(self[col], db=self._db) for col in column_names]
-        return DataFrame(
+        projected = DataFrame(
             f"""
                 SELECT {','.join(targets_str)}
                 FROM {self._name}
             """,
             parents=[self],
         )
+        projected._schema_from_parent = lambda schema: (
+            {name: schema[name] for name in column_names}
+            if all([name in schema for name in column_names])
+            else None
+        )
+        return projected
 
     @_getitem.register(str)
     def _(self, column_name: str) -> "DataFrame":
@@ -125,10 +170,12 @@ class DataFrame:
             if rows.start is None
             else rows.stop - rows.start
         )
-        return DataFrame(
+        sliced = DataFrame(
             f"SELECT * FROM {self._name} LIMIT {limit_clause} {offset_clause}",
             parents=[self],
         )
+        sliced._schema_from_parent = lambda schema: schema
+        return sliced
 
     @overload
     def __getitem__(self, _) -> "DataFrame":
@@ -339,9 +386,11 @@ class DataFrame:
         parents = [self]
         if v._other_dataframe is not None and self._name != v._other_dataframe._name:
             parents.append(v._other_dataframe)
-        return DataFrame(
+        filtered = DataFrame(
             f"SELECT * FROM {self._name} WHERE {v._serialize(db=self._db)}", parents=parents
         )
+        filtered._schema_from_parent = lambda schema: schema
+        return filtered
 
     def apply(
         self,
@@ -728,14 +777,15 @@ class DataFrame:
                 self._depth_first_search(i, visited, lineage)
         lineage.append(t)
 
-    def _serialize(self) -> str:
+    def _serialize(self, materialized: bool = False) -> str:
         # noqa
         """:meta private:"""
         lineage = self._list_lineage()
         cte_list: List[str] = []
+        materialized_clause = "MATERIALIZED " if materialized else ""
         for dataframe in lineage:
             if dataframe._name != self._name:
-                cte_list.append(f"{dataframe._name} AS ({dataframe._query})")
+                cte_list.append(f"{dataframe._name} AS {materialized_clause}({dataframe._query})")
         if len(cte_list) == 0:
             return self._query
         return "WITH " + ",".join(cte_list) + self._query
@@ -847,8 +897,80 @@ class DataFrame:
         assert self._db is not None
         self._contents = self._fetch()
         assert self._contents is not None
+        if self.is_saved:
+            self._db._invalidate_cache(self._qualified_table_name)
         return self
 
+    def bind(self, **params: Any) -> "DataFrame":
+        """
+        Bind values to the parameters that the current :class:`~dataframe.DataFrame` depends on.
+
+        The resulting :class:`~dataframe.DataFrame` is executed as a prepared
+        statement, which is cached in the :class:`~db.Database` and reused
+        by all :class:`~dataframe.DataFrame` of the same shape. This saves
+        the time for parsing and planning when running the same query
+        repeatedly with different values.
+
+        Args:
+            params: values of the parameters created with :func:`~expr.parameter`,
+                keyed by their names.
+
+        Returns:
+            DataFrame: a new :class:`~dataframe.DataFrame` with the values bound.
+
+        Example:
+            .. highlight:: python
+            .. code-block::  Python
+
+                >>> rows = [(1, "a"), (2, "b"), (3, "c")]
+                >>> df = db.create_dataframe(rows=rows, column_names=["id", "name"])
+                >>> lookup = df[lambda t: t["id"] == gp.parameter("id")][["name"]]
+                >>> for i in [1, 3]:
+                ...     print(next(iter(lookup.bind(id=i)))["name"])
+                a
+                c
+
+        Note:
+            Values bound to a :class:`~dataframe.DataFrame` also apply to all
+            the :class:`~dataframe.DataFrame` derived from it.
+        """
+        bound = copy.copy(self)
+        bound._contents = None
+        bound._parameters = {**self._parameters, **params}
+        return bound
+
+    def _bound_parameters(self) -> Dict[str, Any]:
+        # noqa
+        """:meta private:"""
+        # Bound copies share the name of the original DataFrame.
+        resolved: Dict[int, Dict[str, Any]] = {}
+
+        def resolve(dataframe: "DataFrame") -> Dict[str, Any]:
+            if id(dataframe) not in resolved:
+                params: Dict[str, Any] = {}
+                for parent in dataframe._parents:
+                    for name, value in resolve(parent).items():
+                        # DataFrames bound differently cannot be combined
+                        # since a parameter has only one value in the query.
+                        if name in params and params[name] is not value and params[name] != value:
+                            raise Exception(f"Conflicting values bound to parameter '{name}'.")
+                        params[name] = value
+                # Values bound to the descendants take precedence.
+                params.update(dataframe._parameters)
+                resolved[id(dataframe)] = params
+            return resolved[id(dataframe)]
+
+        return resolve(self)
+
+    def _local_settings(self) -> Dict[str, Any]:
+        # noqa
+        """:meta private:"""
+        settings: Dict[str, Any] = {}
+        # Settings of the descendants take precedence.
+        for dataframe in self._list_lineage():
+            settings.update(dataframe._settings)
+        return settings
+
     def _fetch(self, is_all: bool = True) -> Iterable[Tuple[Any]]:
         """
         Fetch rows of this GreenplumPython :class:`~dataframe.DataFrame`.
@@ -870,7 +992,12 @@ class DataFrame:
             f"SELECT to_json({output_name})::TEXT FROM {self._name} AS {output_name}",
             parents=[self],
         )
-        result = self._db._execute(to_json_dataframe._serialize())
+        query = to_json_dataframe._serialize()
+        result = (
+            self._db._execute_prepared(query, self._bound_parameters(), dataframe=self)
+            if len(_parameter_names(query)) > 0
+            else self._db._execute(query, dataframe=self)
+        )
         return result if isinstance(result, Iterable) else []
 
     def save_as(
@@ -896,7 +1023,8 @@ class DataFrame:
         Args:
             table_name: name of table in database, required to be unique in the schema.
             temp: whether table is temporary. Temp tables will be dropped after the database connection is closed.
-            column_names: list of column names
+            column_names: list of column names. If empty, names of the columns
+                in the current :class:`~dataframe.DataFrame` are used.
             storage_params: storage_parameter of gpdb, reference
                 https://docs.vmware.com/en/VMware-Tanzu-Greenplum/7/greenplum-database/GUID-ref_guide-sql_commands-CREATE_TABLE_AS.html
             schema: schema of the table for avoiding name conflicts.
@@ -939,8 +1067,9 @@ class DataFrame:
                 (5 rows)
         """
         assert self._db is not None
-        # TODO: Remove assertion below after implementing schema inference.
-        assert len(column_names) > 0, "Column names of new dataframe are unknown."
+        query = self._serialize()
+        # Statements like CREATE TABLE AS cannot be prepared inside a DO block.
+        assert len(_parameter_names(query)) == 0, "Cannot save a parameterized dataframe."
 
         # build string from parameter dict, such as from {'a': 1, 'b': 2} to
         # 'WITH (a=1, b=2)'
@@ -979,22 +1108,37 @@ class DataFrame:
             BEGIN
                 {DROP_STATEMENT} 
                 CREATE {'TEMP' if temp else ''} TABLE {qualified_table_name}
-                ({','.join(column_names)})
+                {f"({','.join(column_names)})" if len(column_names) > 0 else ''}
                 {storage_params_clause if storage_params else ''}
-                AS {self._serialize()}
+                AS {query}
                 {distribution_clause};
             END;
             $$;
             """,
             has_results=False,
+            dataframe=self,
         )
-        return DataFrame.from_table(table_name, self._db, schema=schema if not temp else "pg_temp")
+        saved = DataFrame.from_table(table_name, self._db, schema=schema if not temp else "pg_temp")
+        assert saved._qualified_table_name is not None
+        self._db._invalidate_cache(saved._qualified_table_name)
+        known_schema = self._known_schema()
+        if known_schema is not None and len(column_names) in [0, len(known_schema)]:
+            self._db._set_cached(
+                ("schema", saved._qualified_table_name),
+                (
+                    dict(zip(column_names, known_schema.values()))
+                    if len(column_names) > 0
+                    else dict(known_schema)
+                ),
+            )
+        return saved
 
     def create_index(
         self,
         columns: Union[Set[str], Dict[str, str]],
         method: str = "btree",
         name: Optional[str] = None,
+        storage_params: dict[str, Any] = {},
     ) -> "DataFrame":
         """
         Create an index for the current dataframe for fast searching.
@@ -1010,6 +1154,9 @@ class DataFrame:
                 values.
             method: name of the index access method.
             name: name of the index.
+            storage_params: storage parameters of the index, which depend on
+                the index access method, e.g. :code:`{"fillfactor": 70}` for
+                btree.
 
         Returns:
             Dataframe with key columns indexed.
@@ -1023,12 +1170,18 @@ class DataFrame:
             if isinstance(columns, dict)
             else [f'"{name}"' for name in columns]
         )
+        storage_params_clause = (
+            f"WITH ({','.join([f'{key}={val}' for key, val in storage_params.items()])})"
+            if storage_params
+            else ""
+        )
         assert self._db is not None
         self._db._execute(
             f'CREATE INDEX "{index_name}" ON {self._qualified_table_name} USING "{method}" ('
             f'   {",".join(keys)}'
-            f")",
+            f") {storage_params_clause}",
             has_results=False,
+            dataframe=self,
         )
         return self
 
@@ -1080,10 +1233,12 @@ class DataFrame:
             sure the result is stable.
         """
         cols: list[Column] = [self[name]._serialize(db=self._db) for name in column_names]
-        return DataFrame(
+        distinct = DataFrame(
             f"SELECT DISTINCT ON ({','.join(cols)}) * FROM {self._name}",
             parents=[self],
         )
+        distinct._schema_from_parent = lambda schema: schema
+        return distinct
 
     @property
     def unique_key(self) -> List[str]:
@@ -1105,6 +1260,7 @@ class DataFrame:
         self._db._execute(
             f"CREATE UNIQUE INDEX ON {self._qualified_table_name} ({','.join(columns)})",
             has_results=False,
+            dataframe=self,
         )
         self._unique_key = columns
         return self
@@ -1265,24 +1421,167 @@ class DataFrame:
             "Please import greenplumpython.experimental.file to load the implementation."
         )
 
+    def _known_schema(self) -> Optional[Dict[str, str]]:
+        # noqa: D400
+        """
+        :meta private:
+
+        Return the schema if it is cached or can be derived without querying the database.
+
+        Schemas of saved tables are cached in the :class:`~db.Database` to be
+        shared by all dataframes of the same table.
+        """
+        if self.is_saved:
+            assert self._db is not None and self._qualified_table_name is not None
+            return self._db._get_cached(("schema", self._qualified_table_name))
+        if self._schema is None and self._schema_from_parent is not None:
+            parent_schema = self._parents[0]._known_schema()
+            if parent_schema is not None:
+                self._schema = self._schema_from_parent(parent_schema)
+        return self._schema
+
     def describe(self) -> dict[str, str]:
         """
-        Return a dictionary summarising the column information of the dataframe, conditional on the table existing in the database.
+        Return a dictionary summarising the column information of the dataframe.
+
+        The column names and types are inferred by running the query of the
+        dataframe with :code:`LIMIT 0`, without fetching any row. The result
+        is cached and is reused by dataframes derived by selecting columns or
+        filtering rows. For a saved table, the result is cached in the
+        :class:`~db.Database` until :data:`~config.catalog_cache_ttl` expires.
 
         Returns:
             Dictionary containing the column names and types.
 
+        Example:
+            .. highlight:: python
+            .. code-block::  Python
+
+                >>> df = db.create_dataframe(columns={"id": [1, 2], "name": ["alice", "bob"]})
+                >>> df.describe()
+                {'id': 'integer', 'name': 'text'}
+                >>> df[lambda t: t["id"] > 1][["name"]].describe()
+                {'name': 'text'}
+        """
+        schema = self._known_schema()
+        if schema is None:
+            assert self._db is not None
+            query = DataFrame(f"SELECT * FROM {self._name} LIMIT 0", parents=[self])._serialize()
+            # Values of parameters do not matter since no row is returned.
+            query = _PARAMETER_PATTERN.sub("NULL", query)
+            schema = dict(self._db._describe(query, dataframe=self))
+            if self.is_saved:
+                assert self._qualified_table_name is not None
+                self._db._set_cached(("schema", self._qualified_table_name), schema)
+            else:
+                self._schema = schema
+        return dict(schema)
+
+    def explain(
+        self, analyze: bool = False, format: Literal["json", "text"] = "json"
+    ) -> Union[Plan, str]:
         """
-        assert self._qualified_table_name is not None, f"Dataframe is not saved in database."
-        columns_query = f"""
-                        SELECT attname AS column_name, atttypid::regtype AS data_type
-                        FROM pg_attribute 
-                        WHERE attrelid = '{self._qualified_table_name}'::regclass and attnum > 0;
-                """
+        Show the plan that the database uses to compute the current :class:`~dataframe.DataFrame`.
+
+        Args:
+            analyze: whether to actually run the query to obtain the time
+                spent and the number of rows returned by each step of the plan.
+            format: :code:`"json"` for a structured :class:`~plan.Plan`, or
+                :code:`"text"` for the plan as displayed by :code:`EXPLAIN` in
+                :code:`psql`.
+
+        Returns:
+            The :class:`~plan.Plan` of the query, or its text representation.
+
+        Example:
+            .. highlight:: python
+            .. code-block::  Python
+
+                >>> rows = [(i,) for i in range(10)]
+                >>> df = db.create_dataframe(rows=rows, column_names=["id"])
+                >>> plan = df.order_by("id")[:3].explain(analyze=True)
+                >>> plan.root.actual_rows
+                3
+                >>> print(df.explain(format="text"))  # doctest: +SKIP
+                Values Scan on "*VALUES*"  (cost=0.00..0.12 rows=10 width=4)
+
+        Warning:
+            With :code:`analyze=True`, the query will be executed, including
+            all side effects of the functions called in it.
+        """
+        assert format in ["json", "text"], f"Unsupported format '{format}' of plan."
+        options = f"ANALYZE {'TRUE' if analyze else 'FALSE'}, FORMAT {format.upper()}"
+        rows = self._explain(self._serialize(), options)
+        if format == "text":
+            return "\n".join(rows)
+        plan: Any = rows[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return Plan(plan[0])
+
+    def _explain(self, query: str, options: str) -> List[Any]:
+        # noqa
+        """:meta private:"""
         assert self._db is not None
-        columns_inf_result = list(self._db._execute(columns_query, has_results=True))  # type: ignore reportUnknownVariableType
-        assert columns_inf_result, f"Table {self._qualified_table_name} does not exists."
-        columns_list: dict[str, str] = {
-            d["column_name"]: d["data_type"] for d in columns_inf_result  # type: ignore reportUnknownVariableType
-        }  # type: ignore reportUnknownVariableType
-        return columns_list
+        result = (
+            self._db._execute_prepared(
+                query, self._bound_parameters(), explain_options=options, dataframe=self
+            )
+            if len(_parameter_names(query)) > 0
+            else self._db._execute(f"EXPLAIN ({options}) {query}", dataframe=self)
+        )
+        assert isinstance(result, Iterable)
+        return [row["QUERY PLAN"] for row in result]
+
+    def profile(self) -> Profile:
+        """
+        Run the query and report the resources consumed by each step in the lineage of the current :class:`~dataframe.DataFrame`.
+
+        Each step is a :class:`~dataframe.DataFrame` from which the current
+        :class:`~dataframe.DataFrame` is derived, together with the method
+        creating it and where in the Python code the method is called. This
+        helps to find out which step is responsible when a long pipeline is slow.
+
+        Returns:
+            :class:`~plan.Profile`: time, rows and memory of each step.
+
+        Example:
+            .. highlight:: python
+            .. code-block::  Python
+
+                >>> rows = [(i,) for i in range(10)]
+                >>> df = db.create_dataframe(rows=rows, column_names=["id"])
+                >>> profile = df[lambda t: t["id"] > 5].order_by("id")[:2].profile()
+                >>> [step.operation for step in profile.steps]
+                ['create_dataframe', '__getitem__', '__getitem__']
+                >>> profile.steps[-1].rows
+                2
+
+        Note:
+            On PostgreSQL 12 and later, every step is materialized when
+            profiling so that it can be timed separately. This may make the
+            plan different from the one used when fetching the data.
+
+        Warning:
+            The query will be executed, including all side effects of the
+            functions called in it.
+        """
+        assert self._db is not None
+        materialized = self._db._conn.server_version >= 120000
+        query = self._serialize(materialized=materialized)
+        plan: Any = self._explain(query, "ANALYZE TRUE, FORMAT JSON")[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        lineage = self._list_lineage()
+        steps = [ProfileStep(df._name, df._operation, df._call_site) for df in lineage[1:]]
+        # CTE names in prepared statements are normalized.
+        plan_names = (
+            _canonical_cte_names(query)
+            if len(_parameter_names(query)) > 0
+            else {step.name: step.name for step in steps}
+        )
+        return Profile(
+            Plan(plan[0]),
+            steps,
+            {plan_names[step.name]: step for step in steps if step.name in plan_names},
+        )
@@ -1,5 +1,8 @@
 """Manage connection to Greenplum/PostgreSQL database."""
 
+import re
+import time
+from collections import OrderedDict
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -11,15 +14,63 @@ from typing import (
     Tuple,
     Union,
 )
+from uuid import uuid4
 
 from greenplumpython import config
 
 if TYPE_CHECKING:
     from greenplumpython.dataframe import DataFrame
     from greenplumpython.func import FunctionExpr, NormalFunction
+    from greenplumpython.monitor import QueryListener
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.sql
+
+# Placeholder of a :func:`~expr.parameter` in the serialized SQL query. It is
+# replaced with a positional parameter, e.g. `$1`, when the query is prepared.
+_PARAMETER_PATTERN = re.compile(r"__gp_param__(\w+)__(?!\w)")
+
+# Names of the CTEs are random. They are replaced with names numbered in the
+# order of appearance so that queries of the same shape share one statement.
+# Quoted names are left as is since they may refer to tables in database.
+_CTE_NAME_PATTERN = re.compile(r'(?<!")\bcte_[0-9a-f]{32}\b')
+
+
+def _parameter_names(query: str) -> List[str]:
+    # noqa: D400
+    """
+    :meta private:
+
+    Return names of the parameters in the query in the order of first appearance.
+    """
+    return list(dict.fromkeys(_PARAMETER_PATTERN.findall(query)))
+
+
+def _canonical_cte_names(query: str) -> Dict[str, str]:
+    # noqa: D400
+    """
+    :meta private:
+
+    Return the mapping from CTE names in the query to their normalized names.
+    """
+    cte_names: Dict[str, str] = {}
+    for name in _CTE_NAME_PATTERN.findall(query):
+        if name not in cte_names:
+            cte_names[name] = f"cte_{len(cte_names):032x}"
+    return cte_names
+
+
+def _canonicalize(query: str) -> str:
+    # noqa: D400
+    """
+    :meta private:
+
+    Return the query with CTE names normalized, which is identical for queries
+    of the same shape.
+    """
+    cte_names = _canonical_cte_names(query)
+    return _CTE_NAME_PATTERN.sub(lambda match: cte_names[match.group(0)], query)
 
 
 class Database:
@@ -44,6 +95,18 @@ class Database:
         )
         self._conn.set_client_encoding("utf-8")
         self._conn.set_session(autocommit=True)
+        # Maps canonical query to the name of its prepared statement in LRU order.
+        self._prepared_statements: OrderedDict[str, str] = OrderedDict()
+        self._listeners: List["QueryListener"] = []
+        # Maps OID of each type seen in results to its name.
+        self._type_names: Dict[int, str] = {}
+        # Maps (kind, relation, ...) to the metadata read from the system
+        # catalogs and the time when it is read.
+        self._catalog_cache: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
+        # DDL statements creating the functions and types required by the
+        # queries to be executed, in the order of dependency, with the objects
+        # created by them.
+        self._pending_ddl: List[Tuple[Any, str]] = []
         version_results = self._execute("SELECT version();")
         assert isinstance(version_results, Iterable)
         self._version: str = next(iter(version_results))[
@@ -55,7 +118,7 @@ class Database:
         return full_name.capitalize() in self._version
 
     def _execute(
-        self, query: str, has_results: bool = True
+        self, query: str, has_results: bool = True, dataframe: Optional["DataFrame"] = None
     ) -> Union[Iterable[dict[str, Any]], int]:
         # noqa: D400 D202
         """
@@ -66,16 +129,357 @@ class Database:
         Args:
             query: str : SQL query
             has_results: bool : whether return None or results
+            dataframe: Optional[DataFrame] : the dataframe that the query is
+                executed for, which is reported to the listeners
 
         Returns:
             Optional[Iterable]: rowcount or result of SQL query
         """
 
+        return self._run(
+            query,
+            lambda cursor: cursor.fetchall() if has_results else cursor.rowcount,
+            dataframe=dataframe,
+        )
+
+    def _describe(
+        self, query: str, dataframe: Optional["DataFrame"] = None
+    ) -> List[Tuple[str, str]]:
+        # noqa: D400 D202
+        """
+        :meta private:
+
+        Return names and types of the columns in the result of SQL query.
+
+        The query is expected to return no rows, e.g. by ending with
+        :code:`LIMIT 0`, since only the description of the result is used.
+
+        Args:
+            query: str : SQL query
+            dataframe: Optional[DataFrame] : the dataframe that the query is
+                executed for, which is reported to the listeners
+
+        Returns:
+            List[Tuple[str, str]]: name and type of each column in order
+        """
+
+        description: List[Tuple[str, int]] = self._run(
+            query,
+            lambda cursor: [(col.name, col.type_code) for col in cursor.description],
+            dataframe=dataframe,
+        )
+        unknown = {oid for _, oid in description if oid not in self._type_names}
+        if len(unknown) > 0:
+            results = self._execute(
+                f"""
+                    SELECT oid::int AS oid, format_type(oid, NULL) AS type_name
+                    FROM pg_type
+                    WHERE oid IN ({','.join([str(oid) for oid in unknown])})
+                """
+            )
+            assert isinstance(results, Iterable)
+            for row in results:
+                self._type_names[row["oid"]] = row["type_name"]
+        return [(name, self._type_names[oid]) for name, oid in description]
+
+    def _run(
+        self,
+        query: str,
+        fetch: Callable[[Any], Any],
+        dataframe: Optional["DataFrame"] = None,
+    ) -> Any:
+        # noqa: D400
+        """
+        :meta private:
+
+        Execute SQL query and return what :code:`fetch` gets from the cursor.
+        """
+        if len(self._pending_ddl) > 0:
+            self._flush_ddl()
+        # The settings of the dataframe apply only while its query is executed,
+        # since they are local to the transaction of the query, i.e. of all the
+        # statements sent at once, without another round trip.
+        settings = dataframe._local_settings() if dataframe is not None else {}
+        statement = self._serialize_settings(settings) + query if len(settings) > 0 else query
         with self._conn.cursor() as cursor:
             if config.print_sql:
-                print(query)
-            cursor.execute(query)
-            return cursor.fetchall() if has_results else cursor.rowcount
+                print(statement)
+            if len(self._listeners) == 0:
+                cursor.execute(statement)
+                return fetch(cursor)
+
+            from greenplumpython.monitor import QueryEvent
+
+            event = QueryEvent(query, dataframe)
+            for listener in self._listeners:
+                listener.on_query_start(event)
+            try:
+                cursor.execute(statement)
+                result = fetch(cursor)
+            except Exception as e:
+                event._end(cursor.rowcount, error=e)
+                for listener in self._listeners:
+                    listener.on_query_end(event)
+                raise
+            event._end(cursor.rowcount, result)
+            for listener in self._listeners:
+                listener.on_query_end(event)
+            return result
+
+    def _serialize_settings(self, settings: Dict[str, Any]) -> str:
+        # noqa: D400
+        """
+        :meta private:
+
+        Return the statement setting the configuration parameters locally in
+        the current transaction, to be sent together with the query.
+        """
+        calls = [
+            "set_config({}, {}, true)".format(
+                psycopg2.sql.Literal(name).as_string(self._conn),
+                psycopg2.sql.Literal(str(value)).as_string(self._conn),
+            )
+            for name, value in settings.items()
+        ]
+        return f"SELECT {','.join(calls)};\n"
+
+    def add_listener(self, listener: "QueryListener") -> None:
+        """
+        Register a listener to be notified when each SQL statement starts and ends.
+
+        Args:
+            listener: a :class:`~monitor.QueryListener`, e.g. a
+                :class:`~monitor.QueryStatistics` collecting statistics of
+                queries.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: "QueryListener") -> None:
+        """Unregister a listener registered with :meth:`~db.Database.add_listener`."""
+        self._listeners.remove(listener)
+
+    def _execute_prepared(
+        self,
+        query: str,
+        params: Dict[str, Any],
+        has_results: bool = True,
+        explain_options: Optional[str] = None,
+        dataframe: Optional["DataFrame"] = None,
+    ) -> Union[Iterable[dict[str, Any]], int]:
+        # noqa: D400 D202
+        """
+        :meta private:
+
+        Execute a parameterized SQL query as a prepared statement.
+
+        The statement is prepared once for each query shape and cached in the
+        :class:`~db.Database`. The least recently used statement is deallocated
+        when there are more than :data:`~config.prepared_statement_cache_size`
+        of them.
+
+        Args:
+            query: str : SQL query containing placeholders of parameters
+            params: Dict[str, Any] : values bound to the parameters by name
+            has_results: bool : whether return None or results
+            explain_options: Optional[str] : options of EXPLAIN if the plan of
+                the statement is requested rather than its results
+            dataframe: Optional[DataFrame] : the dataframe that the query is
+                executed for, which is reported to the listeners
+
+        Returns:
+            Optional[Iterable]: rowcount or result of SQL query
+        """
+
+        names = _parameter_names(query)
+        unbound = [name for name in names if name not in params]
+        if len(unbound) > 0:
+            raise Exception(f"Parameter(s) {unbound} are not bound.")
+        canonical_query = _canonicalize(query)
+        statement = self._prepared_statements.get(canonical_query)
+        if statement is None:
+            statement = "stmt_" + uuid4().hex
+            positional_query = _PARAMETER_PATTERN.sub(
+                lambda match: f"${names.index(match.group(1)) + 1}", canonical_query
+            )
+            self._execute(
+                f"PREPARE {statement} AS {positional_query}",
+                has_results=False,
+                dataframe=dataframe,
+            )
+            self._prepared_statements[canonical_query] = statement
+            while len(self._prepared_statements) > max(config.prepared_statement_cache_size, 1):
+                _, evicted = self._prepared_statements.popitem(last=False)
+                self._execute(f"DEALLOCATE {evicted}", has_results=False)
+        else:
+            self._prepared_statements.move_to_end(canonical_query)
+        args = ",".join(
+            [psycopg2.sql.Literal(params[name]).as_string(self._conn) for name in names]
+        )
+        explain_clause = f"EXPLAIN ({explain_options}) " if explain_options is not None else ""
+        return self._execute(
+            f"{explain_clause}EXECUTE {statement}" + (f"({args})" if len(names) > 0 else ""),
+            has_results=has_results,
+            dataframe=dataframe,
+        )
+
+    def _defer_ddl(self, obj: Any, statement: str) -> None:
+        # noqa: D400
+        """
+        :meta private:
+
+        Defer the DDL statement creating :code:`obj`, e.g. a function or a type,
+        until the next query is executed.
+
+        All deferred statements are sent to the database in one round trip.
+        :code:`obj` is added to :code:`obj._created_in_dbs` once it is created.
+        """
+        self._pending_ddl.append((obj, statement))
+
+    def _is_ddl_pending(self, obj: Any) -> bool:
+        # noqa: D400
+        """:meta private:"""
+        return any([pending is obj for pending, _ in self._pending_ddl])
+
+    def _flush_ddl(self) -> None:
+        # noqa: D400
+        """
+        :meta private:
+
+        Execute all deferred DDL statements in one round trip.
+
+        The statements are executed in a single transaction, so that either
+        all or none of the objects are created. If the transaction fails, the
+        statements are retried one at a time to find the one failing, whose
+        error is raised. Objects before it are created and statements after it
+        are deferred again.
+        """
+        pending, self._pending_ddl = self._pending_ddl, []
+        try:
+            self._run("\n".join([statement for _, statement in pending]), lambda cursor: None)
+        except Exception:
+            for i, (obj, statement) in enumerate(pending):
+                try:
+                    self._run(statement, lambda cursor: None)
+                except Exception:
+                    self._pending_ddl = pending[i + 1 :] + self._pending_ddl
+                    raise
+                obj._created_in_dbs.add(self)
+            # All statements succeeded when retried, e.g. after a transient error.
+            return
+        for obj, _ in pending:
+            obj._created_in_dbs.add(self)
+
+    def _get_entry(self, key: Tuple[Any, ...]) -> Optional[Any]:
+        # noqa: D400
+        """:meta private:"""
+        entry = self._catalog_cache.get(key)
+        if entry is None:
+            return None
+        cached_time, value = entry
+        if (
+            config.catalog_cache_ttl is not None
+            and time.monotonic() - cached_time >= config.catalog_cache_ttl
+        ):
+            del self._catalog_cache[key]
+            return None
+        return value
+
+    def _relation_oid(self, qualified_name: str) -> Optional[int]:
+        # noqa: D400
+        """
+        :meta private:
+
+        Return the oid of the relation, or :code:`None` if it does not exist.
+
+        The oid is the canonical form of the relation in the keys of the cache,
+        since the same relation can be named differently, e.g. with or without
+        the schema. The oid of each name is cached as well.
+        """
+        oid_key = ("oid", qualified_name)
+        oid = self._get_entry(oid_key)
+        if oid is None:
+            name = psycopg2.sql.Literal(qualified_name).as_string(self._conn)
+            result = self._execute(f"SELECT to_regclass({name})::oid AS oid")
+            assert isinstance(result, Iterable)
+            oid = next(iter(result))["oid"]
+            if oid is not None and (
+                config.catalog_cache_ttl is None or config.catalog_cache_ttl > 0
+            ):
+                self._catalog_cache[oid_key] = (time.monotonic(), oid)
+        return oid
+
+    def _get_cached(self, key: Tuple[str, ...]) -> Optional[Any]:
+        # noqa: D400
+        """
+        :meta private:
+
+        Return the cached metadata for the key, or :code:`None` if it is not
+        cached or has expired.
+        """
+        if config.catalog_cache_ttl is not None and config.catalog_cache_ttl <= 0:
+            return None
+        oid = self._relation_oid(key[1])
+        return self._get_entry((key[0], oid, *key[2:])) if oid is not None else None
+
+    def _set_cached(self, key: Tuple[str, ...], value: Any) -> None:
+        # noqa: D400
+        """
+        :meta private:
+
+        Cache the metadata for the key, whose second element is the qualified
+        name of the relation it describes.
+        """
+        if config.catalog_cache_ttl is None or config.catalog_cache_ttl > 0:
+            oid = self._relation_oid(key[1])
+            if oid is not None:
+                self._catalog_cache[(key[0], oid, *key[2:])] = (time.monotonic(), value)
+
+    def invalidate_cache(
+        self, table_name: Optional[str] = None, schema: Optional[str] = None
+    ) -> None:
+        """
+        Invalidate the metadata of tables cached in the :class:`~db.Database`.
+
+        Metadata such as the columns of a table are read from the system
+        catalogs once and shared by all :class:`~dataframe.DataFrame` in the
+        database until they expire after :data:`~config.catalog_cache_ttl`
+        seconds. Call this after altering a table outside GreenplumPython to
+        make the change visible immediately.
+
+        Args:
+            table_name: name of the table to invalidate. All cached metadata
+                is invalidated if it is :code:`None`.
+            schema: schema of the table.
+        """
+        if table_name is None:
+            self._catalog_cache.clear()
+            return
+        qualified_name = f'"{schema}"."{table_name}"' if schema is not None else f'"{table_name}"'
+        self._invalidate_cache(qualified_name, resolve=True)
+
+    def _invalidate_cache(self, qualified_name: str, resolve: bool = False) -> None:
+        # noqa: D400
+        """
+        :meta private:
+
+        Drop the cached metadata of the relation, together with the oid of
+        each name of it since the relation may be dropped and created again.
+
+        Unless :code:`resolve` is :code:`True`, the relation is found only by
+        the oid cached for :code:`qualified_name`, without querying.
+        """
+        if config.catalog_cache_ttl is not None and config.catalog_cache_ttl <= 0:
+            return
+        oid = (
+            self._relation_oid(qualified_name)
+            if resolve
+            else self._get_entry(("oid", qualified_name))
+        )
+        if oid is None:
+            return
+        for key, (_, value) in list(self._catalog_cache.items()):
+            if (key[0] == "oid" and value == oid) or (key[0] != "oid" and key[1] == oid):
+                del self._catalog_cache[key]
 
     def close(self) -> None:
         """Close the database connection."""
@@ -237,6 +641,60 @@ class Database:
             targets.append(f"{_serialize_to_expr(v, db=self)} AS {k}")
         return DataFrame(f"SELECT {','.join(targets)}", db=self)
 
+    def warm_up(self, *calls: "FunctionExpr") -> Dict[int, float]:
+        """
+        Initialize UDFs on the coordinator and on every segment before running the real queries.
+
+        The first call of a UDF in each backend pays for loading the function,
+        e.g. unpickling it, and for what the function initializes on its first
+        call, such as importing packages or loading a model. This method
+        evaluates each of the calls once in the backend serving the current
+        session on each segment, so that the cold-start cost is separated from
+        the latency of later queries.
+
+        Args:
+            calls: calls of UDFs with constant arguments, as representative
+                as possible to trigger the initialization, e.g. :code:`my_func(0)`.
+
+        Returns:
+            Time in milliseconds spent on warming up each segment, where
+            :code:`-1` stands for the coordinator, or for the only server on
+            PostgreSQL.
+
+        Note:
+            On Greenplum, a query involving data motion is executed by more
+            than one backend on each segment, only one of which is warmed up.
+
+        Example:
+            .. highlight:: python
+            .. code-block::  python
+
+                >>> @gp.create_function
+                ... def add_one(val: int) -> int:
+                ...     return val + 1
+
+                >>> times = db.warm_up(add_one(0))
+                >>> -1 in times and all([t >= 0 for t in times.values()])
+                True
+        """
+        from greenplumpython.expr import _serialize_to_expr
+        from greenplumpython.func import _warm_up
+
+        statements = [f"SELECT {_serialize_to_expr(call, db=self)}" for call in calls]
+        warm_up_call = _serialize_to_expr(_warm_up(statements), db=self)
+        queries = [f"SELECT -1 AS segment, {warm_up_call} AS time"]
+        if self._is_variant("greenplum"):
+            queries.append(
+                f"SELECT gp_execution_segment() AS segment, {warm_up_call} AS time "
+                f"FROM gp_dist_random('gp_id')"
+            )
+        times: Dict[int, float] = {}
+        for query in queries:
+            results = self._execute(query)
+            assert isinstance(results, Iterable)
+            times.update({row["segment"]: row["time"] for row in results})
+        return times
+
     # Add interface here for language servers.
     #
     # FIXME: Would be better to return something to inform that whether the
@@ -1,9 +1,14 @@
-from typing import Any, Callable, Literal, Optional, cast
+import json
+import math
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union, cast
 from uuid import uuid4
 
 import greenplumpython as gp
+from greenplumpython import config
+from greenplumpython.col import Expr
+from greenplumpython.plan import Plan
 from greenplumpython.row import Row
-from greenplumpython.type import TypeCast, _serialize_to_expr
+from greenplumpython.type import _serialize_to_expr
 
 
 @gp.create_function
@@ -38,31 +43,132 @@ def _record_dependency(
     )
 
 
-@gp.create_function
-def create_embedding(content: str, model_name: str) -> gp.type_("vector"):  # type: ignore reportUnknownParameterType
+def _load_embedding_model(gd: Dict[str, Any], model_name: str) -> Any:
+    # Return the model, loading it if it is not cached in the backend. The
+    # models are cached with their sizes in bytes, in LRU order, in GD so that
+    # they are shared by all functions in the session.
     import sys
+    from collections import OrderedDict
 
     import sentence_transformers  # type: ignore reportMissingImports
 
-    sd_ = globals().get("SD")
-    if sd_ is None:
-        sd_ = sys.modules["plpy"]._SD
-    if "model" not in sd_:
-        import torch  # pyright: ignore [reportMissingImports, reportUnknownVariableType]
+    models = gd.setdefault("__gp_embedding_models", OrderedDict())
+    if model_name in models:
+        models.move_to_end(model_name)
+        return models[model_name][0]
+    import torch  # pyright: ignore [reportMissingImports, reportUnknownVariableType]
+
+    # Limit the degree of parallelism, otherwise the task may not complete.
+    # FIXME: This number should be set according to the resources available.
+    torch.set_num_threads(4)
+    model = sentence_transformers.SentenceTransformer(model_name)  # type: ignore reportUnknownVariableType
+    tensors = list(model.parameters()) + list(model.buffers())  # type: ignore reportUnknownVariableType
+    models[model_name] = (model, sum([t.numel() * t.element_size() for t in tensors]))
+    # The memory limit of the cache in MB can be set with the GUC
+    # `greenplumpython.embedding_model_cache_size`. The most recently used
+    # model is kept even if it exceeds the limit.
+    cache_size = sys.modules["plpy"].execute(
+        "SELECT current_setting('greenplumpython.embedding_model_cache_size', true) AS val"
+    )[0]["val"]
+    cache_limit = int(cache_size) * 1024 * 1024 if cache_size else 4 * 1024 * 1024 * 1024
+    while len(models) > 1 and sum([size for _, size in models.values()]) > cache_limit:
+        models.popitem(last=False)
+    return model
+
+
+@gp.create_function(helpers=[_load_embedding_model])
+def create_embedding(content: str, model_name: str) -> gp.type_("vector"):  # type: ignore reportUnknownParameterType
+    import sys
 
-        # Limit the degree of parallelism, otherwise the task may not complete.
-        # FIXME: This number should be set according to the resources available.
-        torch.set_num_threads(4)
-        model = sentence_transformers.SentenceTransformer(model_name)  # type: ignore reportUnknownVariableType
-        sd_["model"] = model  # type: ignore reportOptionalSubscript
-    else:
-        model = sd_["model"]  # type: ignore reportOptionalSubscript
+    gd_ = globals().get("GD")
+    if gd_ is None:
+        gd_ = sys.modules["plpy"]._GD
+    model = gd_["__gp_load_embedding_model"](gd_, model_name)  # type: ignore reportOptionalSubscript
 
     # Sentences are encoded by calling model.encode()
     emb = model.encode(content, normalize_embeddings=True)  # type: ignore reportUnknownVariableType
     return emb.tolist()  # type: ignore reportUnknownVariableType
 
 
+def _quantize(
+    embedding: str, quantization: Optional[str], embedding_dimension: Optional[int] = None
+) -> str:
+    # Return the SQL expression converting `embedding` of type `vector` to the
+    # type storing the embeddings with `quantization`, i.e. `vector` if it is
+    # None, `halfvec` if "half" and `bit` if "binary".
+    modifier = f"({embedding_dimension})" if embedding_dimension is not None else ""
+    if quantization == "half":
+        return f"({embedding})::halfvec{modifier}"
+    if quantization == "binary":
+        # Casting to `bit` without modifier would truncate to one bit.
+        return f"binary_quantize({embedding})" + (f"::bit{modifier}" if modifier else "")
+    assert quantization is None, f"Unsupported quantization '{quantization}'."
+    return f"({embedding})::vector{modifier}"
+
+
+def _generate_embeddings(
+    dataframe: gp.DataFrame,
+    unique_key: List[str],
+    column: str,
+    model_name: str,
+    batch_size: int,
+    embedding_cols: Dict[str, Optional[str]],
+    hash_col_name: Optional[str] = None,
+    embedding_dimension: Optional[int] = None,
+) -> gp.DataFrame:
+    # Return a DataFrame of the unique key and the embedding of the content of
+    # each row in `dataframe`. The embedding is included once for each column
+    # in `embedding_cols`, quantized as specified. If `hash_col_name` is
+    # given, the hash of the content is also included to detect changes to the
+    # content when updating the embeddings incrementally.
+    def create_embeddings(contents: str, model_names: str) -> gp.type_("vector"):  # type: ignore reportUnknownParameterType
+        import sys
+
+        gd_ = globals().get("GD")
+        if gd_ is None:
+            gd_ = sys.modules["plpy"]._GD
+        model = gd_["__gp_load_embedding_model"](gd_, str(model_names[0]))  # type: ignore reportOptionalSubscript
+        embs = model.encode(list(contents), normalize_embeddings=True)  # type: ignore reportUnknownVariableType
+        return [str(emb) for emb in embs.tolist()]  # type: ignore reportUnknownVariableType
+
+    # Embeddings of each batch of rows are generated with one call to
+    # `model.encode()` to benefit from the batching of the model.
+    batch_embedding = gp.create_vectorized_function(
+        create_embeddings, batch_size=batch_size, helpers=[_load_embedding_model]
+    )
+    embedded = dataframe[unique_key + [column]].apply(
+        lambda t: batch_embedding(t[column], model_name), column_name="__gp_embedding"
+    )
+    targets = [f'"{name}"' for name in unique_key] + [
+        f'{_quantize("__gp_embedding", quantization, embedding_dimension)} AS "{name}"'
+        for name, quantization in embedding_cols.items()
+    ]
+    if hash_col_name is not None:
+        targets.append(f'md5("{column}"::text) AS "{hash_col_name}"')
+    return gp.DataFrame(f"SELECT {','.join(targets)} FROM {embedded._name}", parents=[embedded])
+
+
+# Suffix of the operator classes of pgvector and the distance operator of each
+# metric. Note that `<#>` returns the negative inner product so that the most
+# similar embeddings come first in ascending order, as with other metrics.
+_METRICS = {
+    "l2": ("l2_ops", "<->"),
+    "cosine": ("cosine_ops", "<=>"),
+    "inner_product": ("ip_ops", "<#>"),
+}
+
+
+def _index_operator(metric: str, quantization: Optional[str]) -> Tuple[str, str]:
+    # Return the operator class and the distance operator for the embeddings
+    # stored with `quantization`.
+    if quantization == "binary":
+        # Binary quantized embeddings are compared by Hamming distance
+        # regardless of the metric.
+        return "bit_hamming_ops", "<~>"
+    op_class_suffix, distance = _METRICS[metric]
+    return ("halfvec_" if quantization == "half" else "vector_") + op_class_suffix, distance
+
+
 class Embedding:
     """
     Embeddings provide a compact and meaningful representation of objects in a numerical vector space.
@@ -81,6 +187,13 @@ class Embedding:
         model_name: str,
         embedding_dimension: Optional[int] = None,
         method: Optional[Literal["ivfflat", "hnsw"]] = "hnsw",
+        batch_size: int = 1000,
+        metric: Literal["l2", "cosine", "inner_product"] = "l2",
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        lists: Optional[int] = None,
+        quantization: Optional[Literal["half", "binary"]] = None,
+        full_precision: bool = False,
     ) -> gp.DataFrame:
         """
         Generate embeddings and create index for a column of unstructured data.
@@ -104,6 +217,24 @@ class Embedding:
             model_name: name of model to generate embedding.
             embedding_dimension: dimension of the embedding.
             method: name of the index access method (i.e. index type) in `pgvector <https://github.com/pgvector/pgvector>`_.
+            batch_size: maximum number of rows whose embeddings are generated
+                together by the model in one call. The rows are batched on
+                each segment.
+            metric: distance metric to measure the similarity of embeddings,
+                which is used by both the index and :meth:`search`.
+            m: maximum number of connections per layer of an "hnsw" index.
+            ef_construction: size of the dynamic candidate list for
+                constructing an "hnsw" index. Larger value improves recall at
+                the cost of build time.
+            lists: number of inverted lists of an "ivfflat" index.
+            quantization: precision for storing and indexing the embeddings
+                to reduce the size of the table and the index. It is
+                "half" for half-precision vectors, or "binary" for
+                binary-quantized vectors compared by Hamming distance. Both
+                require pgvector 0.7.0 or later.
+            full_precision: whether to keep the full-precision embeddings as
+                well when `quantization` is set, so that the results of
+                :meth:`search` can be re-ranked by them.
 
         Returns:
             Dataframe with target column indexed based on embeddings.
@@ -114,6 +245,14 @@ class Embedding:
         """
 
         assert self._dataframe.unique_key is not None, "Unique key is required to create index."
+        assert metric in _METRICS, f"Unsupported metric '{metric}'."
+        assert method == "hnsw" or (
+            m is None and ef_construction is None
+        ), "Parameters 'm' and 'ef_construction' are only for hnsw index."
+        assert method == "ivfflat" or lists is None, "Parameter 'lists' is only for ivfflat index."
+        assert (
+            quantization is not None or not full_precision
+        ), "Full-precision embeddings are only kept along with quantized ones."
         if embedding_dimension is None:
             try:
                 import sentence_transformers  # type: ignore reportMissingImports
@@ -126,17 +265,25 @@ class Embedding:
                 )
 
         embedding_col_name = "_emb_" + uuid4().hex
-        embedding_df_cols = list(self._dataframe.unique_key) + [embedding_col_name]
+        hash_col_name = "_hash_" + uuid4().hex
+        embedding_cols: Dict[str, Optional[str]] = {embedding_col_name: quantization}
+        embedding_df_cols = list(self._dataframe.unique_key) + [embedding_col_name, hash_col_name]
+        if full_precision:
+            full_col_name = "_full_" + uuid4().hex
+            embedding_cols[full_col_name] = None
+            embedding_df_cols.append(full_col_name)
         embedding_df: gp.DataFrame = (
-            self._dataframe.assign(
-                **{
-                    embedding_col_name: cast(
-                        Callable[[gp.DataFrame], TypeCast],
-                        # FIXME: Modifier must be adapted to all types of model.
-                        # Can this be done with transformers.AutoConfig?
-                        lambda t: gp.type_("vector", modifier=embedding_dimension)(create_embedding(t[column], model_name)),  # type: ignore reportUnknownLambdaType
-                    )
-                },
+            _generate_embeddings(
+                self._dataframe,
+                list(self._dataframe.unique_key),
+                column,
+                model_name,
+                batch_size,
+                embedding_cols,
+                hash_col_name,
+                # FIXME: Modifier must be adapted to all types of model.
+                # Can this be done with transformers.AutoConfig?
+                embedding_dimension=embedding_dimension,
             )[embedding_df_cols]
             .save_as(
                 column_names=embedding_df_cols,
@@ -147,8 +294,11 @@ class Embedding:
         )
         if method is not None:
             assert method in ["ivfflat", "hnsw"]
+            index_params = {"m": m, "ef_construction": ef_construction, "lists": lists}
             embedding_df = embedding_df.create_index(
-                columns={embedding_col_name: "vector_l2_ops"}, method=method
+                columns={embedding_col_name: _index_operator(metric, quantization)[0]},
+                method=method,
+                storage_params={key: val for key, val in index_params.items() if val is not None},
             )
         assert self._dataframe._db is not None
         _record_dependency._create_in_db(self._dataframe._db)
@@ -184,7 +334,11 @@ class Embedding:
                         '{embedding_df._qualified_table_name}'::regclass::oid AS embedding_relid,
                         attnum AS content_attnum,
                         {len(self._dataframe._unique_key) + 1} AS embedding_attnum,
+                        {len(self._dataframe._unique_key) + 2} AS hash_attnum,
                         '{model_name}' AS model,
+                        '{metric}' AS metric,
+                        {f"'{quantization}'" if quantization is not None else "NULL"} AS quantization,
+                        {len(self._dataframe._unique_key) + 3 if full_precision else "NULL"} AS full_attnum,
                         ARRAY(SELECT attnum FROM emb_attnum_map WHERE attname != '{column}') AS unique_key
                     FROM attnum_map
                     WHERE attname = '{column}'
@@ -215,16 +369,394 @@ class Embedding:
             $$;
             """
         self._dataframe._db._execute(sql_add_relationship, has_results=False)
+        assert self._dataframe._qualified_table_name is not None
+        self._dataframe._db._invalidate_cache(self._dataframe._qualified_table_name)
         return self._dataframe
 
-    def search(self, column: str, query: Any, top_k: int) -> gp.DataFrame:
+    def update_index(self, column: str, batch_size: int = 1000) -> gp.DataFrame:
+        """
+        Update the embeddings of a column incrementally after the data is changed.
+
+        Embeddings are generated only for the rows that are inserted, or whose
+        content in `column` is changed, since the index was created or last
+        updated. Changes are detected by the unique key and by the hash of the
+        content. Embeddings of the rows deleted are removed.
+
+        Args:
+            column: name of column whose index is to be updated.
+            batch_size: maximum number of rows whose embeddings are generated
+                together by the model in one call.
+
+        Returns:
+            Dataframe with target column indexed based on embeddings.
+
+        Example:
+            Please refer to :ref:`tutorial-embedding` for more details.
+        """
+        assert self._dataframe._db is not None
+        assert self._dataframe._qualified_table_name is not None
+        row = self._embedding_info(column)
+        assert (
+            row["hash_attname"] is not None
+        ), "Index is created without content hash. Please create it again."
+        embedding_table_name = f'"{row["nspname"]}"."{row["relname"]}"'
+        embedding_col_name: str = row["attname"]  # type: ignore reportUnknownVariableType
+        hash_col_name: str = row["hash_attname"]  # type: ignore reportUnknownVariableType
+        unique_key: List[str] = row["unique_key"]  # type: ignore reportUnknownVariableType
+        unique_key_cols = ",".join([f'base."{name}"' for name in unique_key])
+        join_cond = " AND ".join([f'base."{name}" = emb."{name}"' for name in unique_key])
+        # A row lacking embedding has no match in the embedding table and
+        # therefore gets a NULL hash.
+        changed_df = gp.DataFrame(
+            f"""
+                SELECT {unique_key_cols}, base."{column}"
+                FROM {self._dataframe._qualified_table_name} AS base
+                LEFT JOIN {embedding_table_name} AS emb ON {join_cond}
+                WHERE emb."{hash_col_name}" IS DISTINCT FROM md5(base."{column}"::text)
+            """,
+            db=self._dataframe._db,
+        )
+        embedding_cols: Dict[str, Optional[str]] = {embedding_col_name: row["quantization"]}
+        if row["full_attname"] is not None:
+            embedding_cols[row["full_attname"]] = None
+        embedding_df_cols = unique_key + list(embedding_cols.keys()) + [hash_col_name]
+        changed_embedding_df = _generate_embeddings(
+            changed_df,
+            unique_key,
+            column,
+            row["model"],  # type: ignore reportUnknownArgumentType
+            batch_size,
+            embedding_cols,
+            hash_col_name,
+            embedding_dimension=row["embedding_dimension"],  # type: ignore reportUnknownArgumentType
+        ).save_as(
+            column_names=embedding_df_cols,
+            temp=True,
+            distribution_key=set(unique_key),
+            distribution_type="hash",
+        )
+        # Embeddings are generated before modifying the embedding table so
+        # that the index is left unchanged on error.
+        target_cols = ",".join([f'"{name}"' for name in embedding_df_cols])
+        self._dataframe._db._execute(
+            f"""
+            DELETE FROM {embedding_table_name} AS emb
+            WHERE NOT EXISTS (
+                SELECT FROM {self._dataframe._qualified_table_name} AS base WHERE {join_cond}
+            );
+            DELETE FROM {embedding_table_name} AS emb
+            USING {changed_embedding_df._qualified_table_name} AS base
+            WHERE {join_cond};
+            INSERT INTO {embedding_table_name} ({target_cols})
+            SELECT {target_cols} FROM {changed_embedding_df._qualified_table_name};
+            DROP TABLE {changed_embedding_df._qualified_table_name};
+            """,
+            has_results=False,
+        )
+        return self._dataframe
+
+    def _embedding_info(self, column: str) -> Row:
+        # noqa D400
+        """
+        :meta private:
+
+        Returns the name of the table and the column storing the embeddings
+        of `column`, together with the model, the unique key, the dimension
+        of the embeddings and the estimated number of rows of the table.
+        """
+        assert self._dataframe._db is not None
+        assert self._dataframe._qualified_table_name is not None
+        cache_key = ("embedding", self._dataframe._qualified_table_name, column)
+        row: Optional[Row] = self._dataframe._db._get_cached(cache_key)
+        if row is None:
+            embdedding_info = self._dataframe._db._execute(
+                f"""
+                WITH indexed_col_info AS (
+                    SELECT attrelid, attnum AS content_attnum
+                    FROM pg_attribute
+                    WHERE
+                        attrelid = '{self._dataframe._qualified_table_name}'::regclass::oid AND
+                        attname = '{column}'
+                ), reloptions AS (
+                    SELECT unnest(reloptions) AS option
+                    FROM pg_class, indexed_col_info
+                    WHERE pg_class.oid = attrelid
+                ), embedding_info_json AS (
+                    SELECT split_part(option, '=', 2)::json AS val
+                    FROM reloptions, indexed_col_info
+                    WHERE option LIKE format('_pygp_emb_%s=%%', content_attnum)
+                ), embedding_info AS (
+                    SELECT * 
+                    FROM embedding_info_json, json_to_record(val) AS (
+                        embedding_attnum int4,
+                        embedding_relid oid,
+                        model text,
+                        unique_key int[],
+                        hash_attnum int4,
+                        metric text,
+                        quantization text,
+                        full_attnum int4
+                    )
+                ), unique_key_names AS (
+                    SELECT ARRAY(
+                        SELECT attname FROM pg_attribute
+                        WHERE attrelid = embedding_relid AND attnum = ANY(unique_key)
+                    ) AS val
+                    FROM embedding_info
+                )
+                SELECT
+                    nspname,
+                    relname,
+                    attname,
+                    model,
+                    COALESCE(metric, 'l2') AS metric,
+                    unique_key_names.val AS unique_key,
+                    (
+                        SELECT attname FROM pg_attribute
+                        WHERE attrelid = embedding_relid AND attnum = hash_attnum
+                    ) AS hash_attname,
+                    quantization,
+                    (
+                        SELECT attname FROM pg_attribute
+                        WHERE attrelid = embedding_relid AND attnum = full_attnum
+                    ) AS full_attname,
+                    NULLIF(atttypmod, -1) AS embedding_dimension,
+                    (
+                        SELECT reltuples FROM pg_class
+                        WHERE oid = '{self._dataframe._qualified_table_name}'::regclass::oid
+                    ) AS reltuples
+                FROM embedding_info, pg_class, pg_namespace, pg_attribute, unique_key_names
+                WHERE 
+                    pg_class.oid = embedding_relid AND
+                    relnamespace = pg_namespace.oid AND
+                    embedding_relid = attrelid AND
+                    embedding_attnum = attnum;
+                """
+            )
+            row = embdedding_info[0]  # type: ignore reportUnknownVariableType
+            self._dataframe._db._set_cached(cache_key, row)
+        return row
+
+    def _search_settings(self, ef_search: Optional[int], probes: Optional[int]) -> Dict[str, int]:
+        # noqa D400
+        """
+        :meta private:
+
+        Returns the settings of the vector indexes to be applied only while
+        the results are searched.
+        """
+        params = {"hnsw.ef_search": ef_search, "ivfflat.probes": probes}
+        return {name: int(val) for name, val in params.items() if val is not None}
+
+    def _top_k_query(
+        self, row: Row, query_embedding: str, top_k: int, rerank_candidates: Optional[int]
+    ) -> str:
+        # noqa D400
+        """
+        :meta private:
+
+        Returns the SQL query of the unique key of the top k most similar
+        embeddings to `query_embedding`, together with the distance.
+        """
+        unique_key_cols = ",".join([f'"{name}"' for name in row["unique_key"]])  # type: ignore reportUnknownVariableType
+        embedding_table_name = f'"{row["nspname"]}"."{row["relname"]}"'
+        embedding_col_name: str = row["attname"]  # type: ignore reportUnknownVariableType
+        _, distance = _index_operator(row["metric"], row["quantization"])  # type: ignore reportUnknownArgumentType
+        quantized_query = _quantize(query_embedding, row["quantization"])  # type: ignore reportUnknownArgumentType
+        if rerank_candidates is None:
+            return f"""
+                SELECT {unique_key_cols}, "{embedding_col_name}" {distance} {quantized_query} AS distance
+                FROM {embedding_table_name}
+                ORDER BY distance
+                LIMIT {top_k}
+            """
+        full_col_name: Optional[str] = row["full_attname"]  # type: ignore reportUnknownVariableType
+        assert full_col_name is not None, "Full-precision embeddings are not kept for re-ranking."
+        assert rerank_candidates >= top_k, "Number of candidates must be at least top_k."
+        # The candidates are found with the index on the quantized embeddings.
+        full_distance = _METRICS[row["metric"]][1]  # type: ignore reportUnknownArgumentType
+        return f"""
+            SELECT {unique_key_cols}, "{full_col_name}" {full_distance} {query_embedding} AS distance
+            FROM (
+                SELECT {unique_key_cols}, "{full_col_name}"
+                FROM {embedding_table_name}
+                ORDER BY "{embedding_col_name}" {distance} {quantized_query}
+                LIMIT {rerank_candidates}
+            ) AS candidates
+            ORDER BY distance
+            LIMIT {top_k}
+        """
+
+    def _filtered_top_k(
+        self,
+        row: Row,
+        query_df: gp.DataFrame,
+        query_embedding: str,
+        top_k: int,
+        where: Callable[[gp.DataFrame], Expr],
+        strategy: Literal["auto", "pre_filter", "post_filter"],
+        settings: Dict[str, int],
+        rerank_candidates: Optional[int],
+    ) -> gp.DataFrame:
+        # noqa D400
+        """
+        :meta private:
+
+        Returns the DataFrame of the unique key of the top k most similar
+        embeddings to `query_embedding` among the rows satisfying `where`,
+        together with the distance.
+        """
+        assert self._dataframe._db is not None
+        assert strategy in ["auto", "pre_filter", "post_filter"]
+        unique_key: List[str] = row["unique_key"]  # type: ignore reportUnknownVariableType
+        unique_key_cols = ",".join([f'"{name}"' for name in unique_key])
+        filtered_df = self._dataframe.where(where)[unique_key]
+        candidates = 2 * top_k
+        if strategy == "auto":
+            # The number of rows is negative if the table is never analyzed.
+            total_rows = max(float(row["reltuples"]), 1.0)  # type: ignore reportArgumentType
+            filtered_rows = cast(Plan, filtered_df.explain()).root.estimated_rows
+            selectivity = min(filtered_rows / total_rows, 1.0)
+            if selectivity <= config.embedding_pre_filter_selectivity:
+                strategy = "pre_filter"
+            else:
+                strategy = "post_filter"
+                candidates = max(candidates, math.ceil(top_k / selectivity))
+        embedding_table_name = f'"{row["nspname"]}"."{row["relname"]}"'
+        while strategy == "post_filter":
+            if rerank_candidates is not None:
+                candidates = max(candidates, rerank_candidates)
+            candidates_df = gp.DataFrame(
+                self._top_k_query(
+                    row,
+                    query_embedding,
+                    candidates,
+                    candidates if rerank_candidates is not None else None,
+                ),
+                parents=[query_df],
+            )
+            # HNSW index returns at most `hnsw.ef_search` candidates.
+            candidates_df._settings = {"hnsw.ef_search": min(candidates, 1000), **settings}
+            # The results found are fetched together with the number of
+            # candidates and the embedding of the query, which is then reused
+            # by the next rounds rather than computed again.
+            round_df = gp.DataFrame(
+                f"""
+                    SELECT
+                        (SELECT count(*) FROM {candidates_df._name}) AS fetched,
+                        (
+                            SELECT COALESCE(json_agg(top_k ORDER BY distance), '[]')::text
+                            FROM (
+                                SELECT {unique_key_cols}, distance
+                                FROM {candidates_df._name}
+                                JOIN {filtered_df._name} USING ({unique_key_cols})
+                                ORDER BY distance
+                                LIMIT {top_k}
+                            ) AS top_k
+                        ) AS found,
+                        {query_embedding}::text AS query_embedding
+                """,
+                parents=[candidates_df, filtered_df],
+            )
+            result = next(iter(round_df))
+            query_embedding = (
+                f"{_serialize_to_expr(result['query_embedding'], self._dataframe._db)}::vector"
+            )
+            query_df = gp.DataFrame(
+                f"SELECT {query_embedding} AS __gp_query_embedding", db=self._dataframe._db
+            )
+            query_df._settings = settings
+            if len(json.loads(result["found"])) >= top_k:
+                # The results are returned as fetched, with the types of the
+                # unique key in the table of the embeddings.
+                found_cols = ",".join([f'found."{name}"' for name in unique_key])
+                found = _serialize_to_expr(result["found"], self._dataframe._db)
+                return gp.DataFrame(
+                    f"""
+                        SELECT {found_cols}, (elem->>'distance')::float8 AS distance
+                        FROM
+                            json_array_elements({found}::json) AS elem,
+                            json_populate_record(NULL::{embedding_table_name}, elem) AS found
+                    """,
+                    db=self._dataframe._db,
+                )
+            if result["fetched"] < candidates:
+                strategy = "pre_filter"
+            candidates *= 2
+        # Exact search compares the full-precision embeddings if they are kept.
+        full_col_name: Optional[str] = row["full_attname"]  # type: ignore reportUnknownVariableType
+        if full_col_name is not None:
+            embedding_col_name = full_col_name
+            distance = _METRICS[row["metric"]][1]  # type: ignore reportUnknownArgumentType
+        else:
+            embedding_col_name = row["attname"]  # type: ignore reportUnknownVariableType
+            _, distance = _index_operator(row["metric"], row["quantization"])  # type: ignore reportUnknownArgumentType
+            query_embedding = _quantize(query_embedding, row["quantization"])  # type: ignore reportUnknownArgumentType
+        return gp.DataFrame(
+            f"""
+                SELECT {unique_key_cols}, "{embedding_col_name}" {distance} {query_embedding} AS distance
+                FROM {embedding_table_name} JOIN {filtered_df._name} USING ({unique_key_cols})
+                ORDER BY distance
+                LIMIT {top_k}
+            """,
+            parents=[query_df, filtered_df],
+        )
+
+    def search(
+        self,
+        column: str,
+        query: Any,
+        top_k: int,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        rerank_candidates: Optional[int] = None,
+        where: Optional[Callable[[gp.DataFrame], Expr]] = None,
+        strategy: Literal["auto", "pre_filter", "post_filter"] = "auto",
+    ) -> gp.DataFrame:
         """
         Searche unstructured data based on semantic similarity on embeddings.
 
+        With a `where` predicate, the top k most similar results are searched
+        only among the rows satisfying it, with one of the strategies:
+
+        - "pre_filter": the rows are filtered first, and the results are
+          searched exactly among them without the vector index. This is
+          efficient when few rows satisfy the predicate.
+        - "post_filter": the vector index is scanned for more candidates than
+          requested, which are then filtered. The number of candidates is
+          doubled until k results are found. If the index cannot provide
+          enough candidates, "pre_filter" is used instead.
+
+        Unlike searching without `where`, a filtered search executes queries
+        in the database when this method is called: the plan of `where` is
+        explained with "auto", and each round of "post_filter" fetches its
+        results, which are then returned as they are found.
+
         Args:
             column: name of column to search
             query: content to be searched
             top_k: number of most similar results requested
+            ef_search: size of the dynamic candidate list for searching an
+                "hnsw" index. Larger value improves recall at the cost of
+                latency. It is set as `hnsw.ef_search` only while the
+                results are searched.
+            probes: number of inverted lists to probe when searching an
+                "ivfflat" index. Larger value improves recall at the cost of
+                latency. It is set as `ivfflat.probes` only while the
+                results are searched.
+            rerank_candidates: number of candidates to be found with the
+                quantized embeddings and then re-ranked by the full-precision
+                embeddings, which must be kept when creating the index. If
+                :code:`None`, the results are not re-ranked.
+            where: predicate on the current DataFrame that the results must
+                satisfy, in the same form as in :meth:`~dataframe.DataFrame.where`.
+            strategy: strategy to search with `where`. If "auto", it is
+                "pre_filter" when the fraction of rows satisfying `where`
+                estimated by the database is at most
+                :data:`~config.embedding_pre_filter_selectivity`, and
+                "post_filter" otherwise. With "post_filter",
+                `hnsw.ef_search` is raised to the number of candidates
+                unless `ef_search` is given.
 
         Returns:
             Dataframe with the top k most similar results in the `column` of `query`.
@@ -233,64 +765,120 @@ class Embedding:
             Please refer to :ref:`tutorial-embedding` for more details.
         """
         assert self._dataframe._db is not None
-        embdedding_info = self._dataframe._db._execute(
-            f"""
-            WITH indexed_col_info AS (
-                SELECT attrelid, attnum AS content_attnum
-                FROM pg_attribute
-                WHERE
-                    attrelid = '{self._dataframe._qualified_table_name}'::regclass::oid AND
-                    attname = '{column}'
-            ), reloptions AS (
-                SELECT unnest(reloptions) AS option
-                FROM pg_class, indexed_col_info
-                WHERE pg_class.oid = attrelid
-            ), embedding_info_json AS (
-                SELECT split_part(option, '=', 2)::json AS val
-                FROM reloptions, indexed_col_info
-                WHERE option LIKE format('_pygp_emb_%s=%%', content_attnum)
-            ), embedding_info AS (
-                SELECT * 
-                FROM embedding_info_json, json_to_record(val) AS (
-                    embedding_attnum int4, embedding_relid oid, model text, unique_key int[]
-                )
-            ), unique_key_names AS (
-                SELECT ARRAY(
-                    SELECT attname FROM pg_attribute
-                    WHERE attrelid = embedding_relid AND attnum = ANY(unique_key)
-                ) AS val
-                FROM embedding_info
-            )
-            SELECT nspname, relname, attname, model, unique_key_names.val AS unique_key
-            FROM embedding_info, pg_class, pg_namespace, pg_attribute, unique_key_names
-            WHERE 
-                pg_class.oid = embedding_relid AND
-                relnamespace = pg_namespace.oid AND
-                embedding_relid = attrelid AND
-                embedding_attnum = attnum;
-            """
+        row = self._embedding_info(column)
+        unique_key: list[str] = row["unique_key"]  # type: ignore reportUnknownVariableType
+        # The embedding of the query is computed only once, rather than once
+        # for each row. Ordering by the distance to it can then be served by
+        # the vector index.
+        query_embedding = _serialize_to_expr(
+            create_embedding(query, row["model"]), self._dataframe._db  # type: ignore reportUnknownArgumentType
         )
-        row: Row = embdedding_info[0]  # type: ignore reportUnknownVariableType
-        schema: str = row["nspname"]  # type: ignore reportUnknownVariableType
-        embedding_table_name: str = row["relname"]  # type: ignore reportUnknownVariableType
-        model = row["model"]  # type: ignore reportUnknownVariableType
-        embedding_col_name = row["attname"]  # type: ignore reportUnknownVariableType
-        embedding_df = self._dataframe._db.create_dataframe(
-            table_name=embedding_table_name, schema=schema  # type: ignore reportUnknownArgumentType
+        query_df = gp.DataFrame(
+            f"SELECT {query_embedding} AS __gp_query_embedding", db=self._dataframe._db
+        )
+        settings = self._search_settings(ef_search, probes)
+        query_df._settings = settings
+        query_embedding = f"(SELECT __gp_query_embedding FROM {query_df._name})"
+        top_k_df = (
+            gp.DataFrame(
+                self._top_k_query(row, query_embedding, top_k, rerank_candidates),
+                parents=[query_df],
+            )
+            if where is None
+            else self._filtered_top_k(
+                row,
+                query_df,
+                query_embedding,
+                top_k,
+                where,
+                strategy,
+                settings,
+                rerank_candidates,
+            )
         )
-        unique_key: list[str] = row["unique_key"]  # type: ignore reportUnknownVariableType
-        assert embedding_df is not None
-        distance = gp.operator("<->")  # L2 distance is the default operator class in pgvector
         return self._dataframe.join(
-            embedding_df.assign(
-                distance=lambda t: distance(t[embedding_col_name], create_embedding(query, model))
-            ).order_by("distance")[:top_k],
+            top_k_df,
             how="inner",
             on=unique_key,  # type: ignore reportUnknownArgumentType
             self_columns={"*"},
             other_columns={},
         )
 
+    def search_batch(
+        self,
+        column: str,
+        queries: Union[List[Any], gp.DataFrame],
+        top_k: int,
+        query_column: str = "query",
+        query_id_column: str = "query_id",
+        batch_size: int = 1000,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        rerank_candidates: Optional[int] = None,
+    ) -> gp.DataFrame:
+        """
+        Search unstructured data for many queries at once based on semantic similarity on embeddings.
+
+        Embeddings of the queries are generated together in batches. The top k
+        most similar results of each query are then searched by a lateral join
+        of the queries with the embeddings, all in one query to the database.
+
+        Args:
+            column: name of column to search
+            queries: contents to be searched, either as a list, or as a
+                DataFrame having columns `query_column` and `query_id_column`.
+            top_k: number of most similar results requested for each query
+            query_column: name of column of the contents to be searched in
+                `queries` if it is a DataFrame.
+            query_id_column: name of column identifying each query. If
+                `queries` is a list, each query is identified by its index.
+            batch_size: maximum number of queries whose embeddings are
+                generated together by the model in one call.
+            ef_search: same as in :meth:`search`.
+            probes: same as in :meth:`search`.
+            rerank_candidates: same as in :meth:`search`, for each query.
+
+        Returns:
+            Dataframe with the top k most similar results in the `column` of
+            each query, together with the id of the query in column
+            `query_id_column` and the distance to the query in column
+            "distance".
+
+        Example:
+            Please refer to :ref:`tutorial-embedding` for more details.
+        """
+        assert self._dataframe._db is not None
+        row = self._embedding_info(column)
+        unique_key: List[str] = row["unique_key"]  # type: ignore reportUnknownVariableType
+        if not isinstance(queries, gp.DataFrame):
+            queries = self._dataframe._db.create_dataframe(
+                columns={query_id_column: list(range(len(queries))), query_column: queries}
+            )
+        query_embedding_df = _generate_embeddings(
+            queries,
+            [query_id_column],
+            query_column,
+            row["model"],  # type: ignore reportUnknownArgumentType
+            batch_size,
+            {"__gp_query_embedding": None},
+        )
+        top_k_query = self._top_k_query(row, "query.__gp_query_embedding", top_k, rerank_candidates)
+        top_k_df = gp.DataFrame(
+            f"""
+                SELECT query."{query_id_column}", top_k.*
+                FROM {query_embedding_df._name} AS query, LATERAL ({top_k_query}) AS top_k
+            """,
+            parents=[query_embedding_df],
+        )
+        top_k_df._settings = self._search_settings(ef_search, probes)
+        return top_k_df.join(
+            self._dataframe,
+            how="inner",
+            on=unique_key,  # type: ignore reportUnknownArgumentType
+            self_columns={query_id_column, "distance"},
+            other_columns={"*"},
+        )
+
 
 def _embedding(dataframe: gp.DataFrame) -> Embedding:
     return Embedding(dataframe=dataframe)
@@ -7,6 +7,7 @@ from greenplumpython.db import Database
 
 if TYPE_CHECKING:
     from greenplumpython.dataframe import DataFrame
+    from greenplumpython.type import DataType
 
 
 class Expr:
@@ -576,10 +577,14 @@ class BinaryExpr(Expr):
     ):
         # noqa: D107
         dataframe = left._dataframe if isinstance(left, Expr) else None
-        if dataframe is not None and isinstance(right, Expr):
+        if dataframe is not None and isinstance(right, Expr) and right._dataframe is not None:
             dataframe = right._dataframe
         other_dataframe = left._other_dataframe if isinstance(left, Expr) else None
-        if other_dataframe is not None and isinstance(right, Expr):
+        if (
+            other_dataframe is not None
+            and isinstance(right, Expr)
+            and right._other_dataframe is not None
+        ):
             other_dataframe = right._other_dataframe
         super().__init__(dataframe=dataframe, other_dataframe=other_dataframe)
         self._operator = operator
@@ -691,3 +696,61 @@ class InExpr(Expr):
             f'(EXISTS (SELECT FROM unnest({_serialize_to_expr(self._container, db=db)}) AS "{container_name}"'
             f' WHERE ("{container_name}" = {self._item._serialize(db=db)})))'
         )
+
+
+class Parameter(Expr):
+    """
+    Inherited from :class:`~expr.Expr`.
+
+    Representation of a placeholder whose value is bound when the
+    :class:`~dataframe.DataFrame` is executed with :meth:`~dataframe.DataFrame.bind`.
+    """
+
+    def __init__(self, name: str, type_: Optional["DataType"] = None) -> None:
+        # noqa: D107
+        assert name.isidentifier(), f"Parameter name '{name}' is not a valid identifier."
+        super().__init__()
+        self._name = name
+        self._type = type_
+
+    def _serialize(self, db: Optional[Database] = None) -> str:
+        placeholder = f"__gp_param__{self._name}__"
+        if self._type is None:
+            return placeholder
+        return f"({placeholder}::{self._type._qualified_name_str})"
+
+
+def parameter(name: str, type_: Optional["DataType"] = None) -> Parameter:
+    """
+    Create a named parameter to be used in place of a constant.
+
+    A :class:`~dataframe.DataFrame` depending on parameters is executed as a
+    prepared statement in database. The statement is parsed and planned once
+    for each query shape, and is reused with different values bound by
+    :meth:`~dataframe.DataFrame.bind`.
+
+    Args:
+        name: name of the parameter, which needs to be a valid Python identifier.
+        type_: type of the parameter in database. If not specified, the type
+            will be inferred from the context where the parameter is used.
+
+    Returns:
+        :class:`~expr.Parameter`: the parameter as an expression.
+
+    Example:
+        .. highlight:: python
+        .. code-block::  Python
+
+            >>> rows = [(i,) for i in range(5)]
+            >>> df = db.create_dataframe(rows=rows, column_names=["id"])
+            >>> lookup = df[lambda t: t["id"] > gp.parameter("lower", gp.type_("int4"))]
+            >>> lookup.bind(lower=2).order_by("id")[:]
+            ----
+             id
+            ----
+              3
+              4
+            ----
+            (2 rows)
+    """
+    return Parameter(name, type_)
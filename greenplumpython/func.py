@@ -1,24 +1,49 @@
 """To create and call Greenplum/PostgreSQL UDFs or UDAs."""
 import ast
+import base64
 import functools
+import hashlib
 import inspect
+import io
 import json
 import sys
 import sysconfig
+import weakref
+import zlib
 from textwrap import dedent
-from typing import Any, Callable, List, Literal, Optional, Set, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    MutableSet,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from uuid import uuid4
 
 import dill  # type: ignore reportMissingTypeStubs
 
 dill.settings["recurse"] = True
 
+from greenplumpython import config
 from greenplumpython.col import Column
 from greenplumpython.dataframe import DataFrame
 from greenplumpython.db import Database
 from greenplumpython.expr import Expr, _serialize_to_expr
 from greenplumpython.group import DataFrameGroupingSet
-from greenplumpython.type import _serialize_to_type
+from greenplumpython.type import (
+    PackedArray,
+    TypeCast,
+    _pack_array,
+    _packed_element_types,
+    _serialize_to_type,
+    _unpack_array,
+    _unpack_columns,
+)
 
 
 class FunctionExpr(Expr):
@@ -184,10 +209,25 @@ class ArrayFunctionExpr(FunctionExpr):
             if grouping_col_names is not None
             else None
         )
+        function = self._function
+        packed_params = (
+            function._packed_params()
+            if isinstance(function, ColumnFunction) and function._packed
+            else []
+        )
+        if len(packed_params) > 0:
+            packed_args = [
+                (self._args[i], param.annotation.__args__[0])
+                for i, param in enumerate(function._params())
+                if param in packed_params
+            ]
+            args_string_list.append(_serialize_packed_columns(packed_args, db=db))
         if any(self._args):
             for i in range(len(self._args)):
                 if self._args[i] is None:
                     continue
+                if len(packed_params) > 0 and function._params()[i] in packed_params:
+                    continue
                 if isinstance(self._args[i], Expr):
                     if grouping_cols is None or self._args[i] not in grouping_cols:
                         s = f"array_agg({_serialize_to_expr(self._args[i], db=db)})"  # type: ignore
@@ -214,6 +254,124 @@ class ArrayFunctionExpr(FunctionExpr):
         )
 
 
+def _unannotated_source(func: Callable[..., Any]) -> str:
+    # noqa D400
+    """
+    :meta private:
+
+    Return the source of a self-contained function with type annotations
+    removed, so that it can be defined without importing the types.
+    """
+    func_ast: ast.FunctionDef = ast.parse(dedent(inspect.getsource(func))).body[0]
+    for arg in func_ast.args.args:
+        arg.annotation = None
+    func_ast.returns = None
+    return ast.unparse(func_ast)
+
+
+def _create_if_absent(qualified_name: str, statement: str) -> str:
+    # noqa D400
+    """
+    :meta private:
+
+    Wrap the statement creating a persistent function so that it succeeds if
+    the function has been created by another session, possibly concurrently.
+    """
+    return (
+        f"DO $gp_udf$\n"
+        f"BEGIN\n"
+        f"    IF to_regproc('{qualified_name}') IS NULL THEN\n"
+        f"{statement}\n"
+        f"    END IF;\n"
+        f"EXCEPTION WHEN duplicate_function OR unique_violation THEN\n"
+        f"    NULL;\n"
+        f"END;\n"
+        f"$gp_udf$;"
+    )
+
+
+class _CapturedObject:
+    # noqa D400
+    """
+    :meta private:
+
+    A large object captured by UDFs, stored once in database for all of them.
+
+    The compressed pickle of the object is returned by a SQL function named by
+    its digest, which works on Greenplum segments as well since no table is
+    accessed. It is fetched by each session at most once, when a UDF
+    referring to it is called for the first time.
+
+    Only the digest is kept in memory. The pickle is given when the object is
+    created in a database, and the databases are referred to weakly so that
+    they are not kept alive by the object.
+    """
+
+    def __init__(self, digest: str, schema: str) -> None:
+        self._digest = digest
+        self._qualified_name_str = f'"{schema}"."__gp_object_{digest}"'
+        self._is_persistent = schema != "pg_temp"
+        self._created_in_dbs: MutableSet[Database] = weakref.WeakSet()
+
+    def _create_in_db(self, db: Database, pickled: bytes) -> None:
+        if db in self._created_in_dbs or db._is_ddl_pending(self):
+            return
+        payload = base64.b64encode(zlib.compress(pickled)).decode("ascii")
+        statement = (
+            f"CREATE FUNCTION {self._qualified_name_str}() RETURNS bytea "
+            f"AS $$ SELECT decode('{payload}', 'base64') $$ LANGUAGE sql IMMUTABLE;"
+        )
+        if self._is_persistent:
+            statement = _create_if_absent(self._qualified_name_str, statement)
+        db._defer_ddl(self, statement)
+
+
+# Maps the schema and the digest of each captured object to the object.
+_captured_objects: Dict[Tuple[str, str], _CapturedObject] = {}
+
+
+class _ReferencingPickler(dill.Pickler):
+    # noqa D400
+    """
+    :meta private:
+
+    Pickler replacing the captured objects with their digests.
+    """
+
+    def __init__(self, file: io.BytesIO, objects: Dict[int, _CapturedObject]) -> None:
+        super().__init__(file)
+        self._objects = objects
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        captured = self._objects.get(id(obj))
+        return captured._digest if captured is not None else None
+
+
+def _load_pickled(payload: str, schema: str, gd: Dict[str, Any], plpy: Any) -> Any:
+    # noqa D400
+    """
+    :meta private:
+
+    Load a function pickled by :class:`~func._ReferencingPickler` inside UDF,
+    fetching the captured objects it refers to into :code:`GD`.
+    """
+    import base64
+    import io
+    import zlib
+
+    import dill
+
+    class Unpickler(dill.Unpickler):
+        def persistent_load(self, pid):
+            key = "__gp_object_" + pid
+            if key not in gd:
+                rows = plpy.execute(f'SELECT "{schema}"."{key}"() AS pickled')
+                gd[key] = dill.loads(zlib.decompress(rows[0]["pickled"]))
+            return gd[key]
+
+    return Unpickler(io.BytesIO(zlib.decompress(base64.b64decode(payload)))).load()
+
+
 # The parent class for all database functions.
 # It is not a Callable by design to prevent misuse.
 class _AbstractFunction:
@@ -228,7 +386,7 @@ class _AbstractFunction:
         # Python function will be passed to wrapped_func.
         self._name = "func_" + uuid4().hex if wrapped_func is not None else name
         assert self._name is not None
-        self._schema = "pg_temp" if wrapped_func is not None else None if schema is None else schema
+        self._schema = schema if wrapped_func is None or schema is not None else "pg_temp"
         self._qualified_name_str = (
             f'"{self._name}"' if self._schema is None else f'"{self._schema}"."{self._name}"'
         )
@@ -272,12 +430,46 @@ class NormalFunction(_AbstractFunction):
         name: Optional[str] = None,
         schema: Optional[str] = None,
         language_handler: Literal["plpython3u"] = "plpython3u",
+        volatility: Optional[Literal["immutable", "stable", "volatile"]] = None,
+        parallel: Optional[Literal["safe", "restricted", "unsafe"]] = None,
+        strict: bool = False,
+        cost: Optional[float] = None,
+        rows: Optional[float] = None,
+        helpers: Optional[List[Callable[..., Any]]] = None,
     ) -> None:
         # noqa D107
         super().__init__(wrapped_func, name, schema)
         self._created_in_dbs: Optional[Set[Database]] = set() if wrapped_func is not None else None
         self._wrapped_func = wrapped_func
         self._language_handler = language_handler
+        self._volatility = volatility
+        self._parallel = parallel
+        self._strict = strict
+        self._cost = cost
+        self._rows = rows
+        self._shared_helpers = list(helpers) if helpers is not None else []
+        if self._is_persistent:
+            # Name the function by its content so that it is reused as long as
+            # the function and its definition are not changed.
+            self._name = "func_" + self._digest()
+            self._qualified_name_str = f'"{self._schema}"."{self._name}"'
+
+    def _digest(self) -> str:
+        # noqa D400
+        """
+        :meta private:
+
+        Return the digest of the wrapped function together with everything
+        else defining the UDF, which does not depend on the database.
+        """
+        assert self._wrapped_func is not None
+        definition = (
+            f"{type(self).__name__} {inspect.signature(self._wrapped_func)} "
+            f"{self._language_handler} {self._volatility} {self._parallel} {self._strict} "
+            f"{self._cost} {self._rows} {[helper.__name__ for helper in self._shared_helpers]} "
+            f"{sysconfig.get_python_version()}"
+        )
+        return hashlib.sha256(dill.dumps(self._wrapped_func) + definition.encode()).hexdigest()[:32]
 
     def unwrap(self) -> Callable[..., Any]:
         """Get the wrapped Python function in the database function."""
@@ -300,17 +492,16 @@ class NormalFunction(_AbstractFunction):
             func_ast, ast.FunctionDef
         ), f"{self._wrapped_func} is not a function. (lambda is not supported.)"
         func_sig = inspect.signature(self._wrapped_func)
-        func_args = ",".join(
-            [
-                f'"{param.name}" {_serialize_to_type(param.annotation, db=db)}'
-                for param in func_sig.parameters.values()
-            ]
-        )
-        func_arg_names = ",".join(
-            [f"{param.name}={param.name}" for param in func_sig.parameters.values()]
-        )
-        return_type = _serialize_to_type(func_sig.return_annotation, db=db, for_return=True)
-        func_pickled: bytes = dill.dumps(self._wrapped_func)
+        func_args = self._serialize_params(list(func_sig.parameters.values()), db=db)
+        return_type = self._serialize_return_type(func_sig.return_annotation, db=db)
+        captured_objects = self._capture_objects(db)
+        buffer = io.BytesIO()
+        _ReferencingPickler(buffer, captured_objects).dump(self._wrapped_func)
+        func_pickled: bytes = buffer.getvalue()
+        python_version = sysconfig.get_python_version()
+        options = self._serialize_options(db)
+        if self._is_persistent and ("pg_temp" in func_args or "pg_temp" in return_type):
+            raise Exception("Functions using composite types cannot be persisted.")
         _, func_name = self._qualified_name
         # Modify the AST of the wrapped function to minify dependency: (1-3)
         # 1. Apply random renaming to avoid name conflict. (TODO: Support
@@ -322,22 +513,40 @@ class NormalFunction(_AbstractFunction):
             arg.annotation = None
         func_ast.returns = None
         # 3. Prepend imports for modules referred to in the body.
-        global_objects: List[Any] = dill.detect.globalvars(self._wrapped_func).values()
+        # Captured objects can only be loaded with dill.
+        global_objects: List[Any] = [
+            obj
+            for obj in dill.detect.globalvars(self._wrapped_func).values()
+            if id(obj) not in captured_objects
+        ]
         importables: List[str] = [dill.source.getimportable(obj) for obj in global_objects]
         importables_ast: List[ast.Import] = ast.parse(dedent("".join(importables))).body
         func_ast.body = importables_ast + func_ast.body
 
         pickle_lib_name: str = "__lib_" + uuid4().hex
         sysconfig_lib_name: str = "__lib_" + uuid4().hex
-        python_version = sysconfig.get_python_version()
         sys_lib_name: str = "__lib_" + uuid4().hex
-        return (
+        func_call = self._serialize_call(
+            f"GD['{func_ast.name}']",
+            list(func_sig.parameters.values()),
+            func_sig.return_annotation,
+        )
+        helpers_loader = "".join(
+            [
+                f"    exec({json.dumps(_unannotated_source(helper))}, globals())\n"
+                f"    GD['__gp{helper.__name__}'] = globals()['{helper.__name__}']\n"
+                for helper in [_load_pickled] + self._helpers(func_sig)
+            ]
+        )
+        payload = base64.b64encode(zlib.compress(func_pickled)).decode("ascii")
+        create_function_statement = (
             f"CREATE FUNCTION {self._qualified_name_str} ({func_args}) "
             f"RETURNS {return_type} "
             f"AS $$\n"
             f"try:\n"
-            f"    return GD['{func_ast.name}']({func_arg_names})\n"
+            f"    return {func_call}\n"
             f"except KeyError:\n"
+            f"{helpers_loader}"
             f"    try:\n"
             f"        import dill as {pickle_lib_name}\n"
             f"        import sysconfig as {sysconfig_lib_name}\n"
@@ -345,25 +554,191 @@ class NormalFunction(_AbstractFunction):
             f"        if {sysconfig_lib_name}.get_python_version() != '{python_version}':\n"
             f"            raise ModuleNotFoundError\n"
             f"        setattr({sys_lib_name}.modules['plpy'], '_SD', SD)\n"
-            f"        GD['{func_ast.name}'] = {pickle_lib_name}.loads({func_pickled})\n"
+            f"        setattr({sys_lib_name}.modules['plpy'], '_GD', GD)\n"
+            f"        GD['{func_ast.name}'] = GD['__gp_load_pickled'](\n"
+            f"            '{payload}', '{self._schema}', GD, plpy\n"
+            f"        )\n"
             f"    except ModuleNotFoundError:\n"
             f"        exec({json.dumps(ast.unparse(func_ast))}, globals())\n"
             f"        GD['{func_ast.name}'] = globals()['{func_ast.name}']\n"
-            f"    return GD['{func_ast.name}']({func_arg_names})\n"
-            f"$$ LANGUAGE {self._language_handler};"
+            f"    return {func_call}\n"
+            f"$$ LANGUAGE {self._language_handler}{options};"
+        )
+        if not self._is_persistent:
+            return create_function_statement
+        return _create_if_absent(self._qualified_name_str, create_function_statement)
+
+    def _capture_objects(self, db: Database) -> Dict[int, "_CapturedObject"]:
+        # noqa D400
+        """
+        :meta private:
+
+        Return the large objects referred to by the wrapped function, e.g.
+        fitted models, by their :code:`id()`, each to be stored in database
+        as a :class:`~func._CapturedObject` rather than pickled with the
+        function.
+        """
+        assert self._wrapped_func is not None
+        candidates = list(inspect.getclosurevars(self._wrapped_func).nonlocals.values()) + list(
+            dill.detect.globalvars(self._wrapped_func).values()
+        )
+        objects: Dict[int, _CapturedObject] = {}
+        for obj in candidates:
+            if id(obj) in objects or any(
+                [inspect.ismodule(obj), inspect.isroutine(obj), inspect.isclass(obj)]
+            ):
+                continue
+            pickled: bytes = dill.dumps(obj)
+            if len(pickled) >= config.udf_object_size_threshold:
+                digest = hashlib.sha256(pickled).hexdigest()[:32]
+                if (self._schema, digest) not in _captured_objects:
+                    _captured_objects[(self._schema, digest)] = _CapturedObject(
+                        digest, self._schema
+                    )
+                objects[id(obj)] = _captured_objects[(self._schema, digest)]
+                objects[id(obj)]._create_in_db(db, pickled)
+        return objects
+
+    def _serialize_options(self, db: Database) -> str:
+        # noqa D400
+        """
+        :meta private:
+
+        Return the clauses declaring the properties of the function to the
+        planner, each preceded by a space.
+        """
+        options: List[str] = []
+        if self._volatility is not None:
+            options.append(self._volatility.upper())
+        if self._strict:
+            options.append("STRICT")
+        # Greenplum does not run queries with parallel workers.
+        if self._parallel is not None and not db._is_variant("greenplum"):
+            options.append(f"PARALLEL {self._parallel.upper()}")
+        if self._cost is not None:
+            options.append(f"COST {self._cost}")
+        if self._rows is not None:
+            options.append(f"ROWS {self._rows}")
+        return "".join([" " + option for option in options])
+
+    def _serialize_params(self, params: List[inspect.Parameter], db: Database) -> str:
+        # noqa D400
+        """:meta private:"""
+        return ",".join(
+            [
+                f'"{param.name}" {self._serialize_param_type(param.annotation, db=db)}'
+                for param in params
+            ]
+        )
+
+    def _serialize_param_type(self, annotation: Any, db: Database) -> str:
+        # noqa D400
+        """:meta private:"""
+        return _serialize_to_type(annotation, db=db)
+
+    def _serialize_return_type(self, annotation: Any, db: Database) -> str:
+        # noqa D400
+        """:meta private:"""
+        return _serialize_to_type(annotation, db=db, for_return=True)
+
+    def _serialize_call(
+        self, func: str, params: List[inspect.Parameter], return_annotation: Any
+    ) -> str:
+        # noqa D400
+        """
+        :meta private:
+
+        Return the Python expression calling the wrapped function inside the UDF.
+        """
+        args = ",".join(
+            [
+                (
+                    f"{param.name}=GD['__gp_unpack_array']({param.name}, '{param.annotation._dtype}')"
+                    if isinstance(param.annotation, PackedArray)
+                    else f"{param.name}={param.name}"
+                )
+                for param in params
+            ]
         )
+        if isinstance(return_annotation, PackedArray):
+            return (
+                f"GD['__gp_pack_array']({func}({args}), "
+                f"'{return_annotation._dtype}', {return_annotation._type_oid})"
+            )
+        return f"{func}({args})"
+
+    def _helpers(self, func_sig: inspect.Signature) -> List[Callable[..., Any]]:
+        # noqa D400
+        """
+        :meta private:
+
+        Return the self-contained helper functions to be sent in the UDF and
+        stored in :code:`GD` with their names prefixed by :code:`__gp`.
+        """
+        annotations = [param.annotation for param in func_sig.parameters.values()]
+        if any([isinstance(t, PackedArray) for t in annotations + [func_sig.return_annotation]]):
+            return self._shared_helpers + [_pack_array, _unpack_array]
+        return self._shared_helpers
+
+    def _pack_args(self, args: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        # noqa D400
+        """
+        :meta private:
+
+        Convert the arguments for parameters annotated with :func:`~type.packed_array`.
+        """
+        if self._wrapped_func is None:
+            return args
+        params = list(inspect.signature(self._wrapped_func).parameters.values())
+        packed_args: List[Any] = []
+        for param, arg in zip(params, args):
+            annotation = param.annotation
+            if isinstance(annotation, PackedArray) and arg is not None and not _is_packed(arg):
+                arg = (
+                    FunctionExpr(
+                        function("array_send"),
+                        (TypeCast(arg, f"{annotation._element_type_name}[]"),),
+                    )
+                    if isinstance(arg, Expr)
+                    else _pack_array(arg, annotation._dtype, annotation._type_oid)
+                )
+            packed_args.append(arg)
+        return tuple(packed_args) + tuple(args[len(params) :])
+
+    @property
+    def _is_persistent(self) -> bool:
+        return self._wrapped_func is not None and self._schema != "pg_temp"
 
     def _create_in_db(self, db: Database) -> None:
         if self._wrapped_func is None:  # Function has already existed.
             return
         assert self._created_in_dbs is not None
-        if db not in self._created_in_dbs:
-            assert db._execute(self._serialize(db=db), has_results=False) == -1
-            self._created_in_dbs.add(db)
+        if db not in self._created_in_dbs and not db._is_ddl_pending(self):
+            db._defer_ddl(self, self._serialize(db=db))
 
     def __call__(self, *args: Any) -> FunctionExpr:
         """Call the dataframe function with the given arguments."""
-        return FunctionExpr(self, args)
+        return FunctionExpr(self, self._pack_args(args))
+
+
+def _is_packed(arg: Any) -> bool:
+    # noqa D400
+    """
+    :meta private:
+
+    Check whether the argument is already packed, i.e. a :code:`bytea`, which
+    is returned by a function returning packed array, or cast explicitly.
+    """
+    if isinstance(arg, bytes):
+        return True
+    if isinstance(arg, TypeCast):
+        return arg._qualified_type_name in ["bytea", '"bytea"']
+    if isinstance(arg, FunctionExpr) and isinstance(arg._func, NormalFunction):
+        wrapped_func = arg._func._wrapped_func
+        return wrapped_func is not None and isinstance(
+            inspect.signature(wrapped_func).return_annotation, PackedArray
+        )
+    return False
 
 
 def function(name: str, schema: Optional[str] = None) -> NormalFunction:
@@ -427,6 +802,10 @@ class AggregateFunction(_AbstractFunction):
         transition_func: Optional[NormalFunction] = None,
         name: Optional[str] = None,
         schema: Optional[str] = None,
+        combine_func: Optional[NormalFunction] = None,
+        final_func: Optional[NormalFunction] = None,
+        initial_condition: Optional[str] = None,
+        parallel: Optional[Literal["safe", "restricted", "unsafe"]] = None,
     ) -> None:
         # noqa D107
         super().__init__(
@@ -435,6 +814,10 @@ class AggregateFunction(_AbstractFunction):
             schema,
         )
         self._transition_func = transition_func
+        self._combine_func = combine_func
+        self._final_func = final_func
+        self._initial_condition = initial_condition
+        self._parallel = parallel
         self._created_in_dbs: Optional[Set[Database]] = (
             set() if transition_func is not None else None
         )
@@ -454,7 +837,7 @@ class AggregateFunction(_AbstractFunction):
         if self._transition_func is None:
             return
         assert self._created_in_dbs is not None
-        if db not in self._created_in_dbs:
+        if db not in self._created_in_dbs and not db._is_ddl_pending(self):
             self._transition_func._create_in_db(db)
             sig = inspect.signature(self.transition_function.unwrap())
             param_list = iter(sig.parameters.values())
@@ -465,17 +848,33 @@ class AggregateFunction(_AbstractFunction):
                     for param in param_list
                 ]
             )
+            options = [
+                f"SFUNC = {self.transition_function._qualified_name_str}",
+                f"STYPE = {_serialize_to_type(state_param.annotation, db=db)}",
+            ]
+            if self._combine_func is not None:
+                self._combine_func._create_in_db(db)
+                options.append(f"COMBINEFUNC = {self._combine_func._qualified_name_str}")
+            if self._final_func is not None:
+                self._final_func._create_in_db(db)
+                options.append(f"FINALFUNC = {self._final_func._qualified_name_str}")
+            if self._initial_condition is not None:
+                initial_condition = self._initial_condition.replace("'", "''")
+                options.append(f"INITCOND = '{initial_condition}'")
+            # Greenplum runs the aggregate in two phases on segments as long
+            # as it is combinable, while PostgreSQL runs it in parallel
+            # workers only if it is marked as parallel safe.
+            if self._parallel is not None and not db._is_variant("greenplum"):
+                options.append(f"PARALLEL = {self._parallel.upper()}")
             # -- Creation of UDA in Greenplum
-            db._execute(
+            db._defer_ddl(
+                self,
                 (
                     f"CREATE AGGREGATE {self._qualified_name_str} ({args_string}) (\n"
-                    f"    SFUNC = {self.transition_function._qualified_name_str},\n"
-                    f"    STYPE = {_serialize_to_type(state_param.annotation, db=db)}\n"
-                    f");\n"
+                    + ",\n".join([f"    {option}" for option in options])
+                    + "\n);\n"
                 ),
-                has_results=False,
             )
-            self._created_in_dbs.add(db)
 
     def distinct(self, *args: Any) -> FunctionExpr:
         """
@@ -547,6 +946,13 @@ def aggregate_function(name: str, schema: Optional[str] = None) -> AggregateFunc
 def create_function(
     wrapped_func: Optional[Callable[..., Any]] = None,
     language_handler: Literal["plpython3u"] = "plpython3u",
+    schema: Optional[str] = None,
+    volatility: Optional[Literal["immutable", "stable", "volatile"]] = None,
+    parallel: Optional[Literal["safe", "restricted", "unsafe"]] = None,
+    strict: bool = False,
+    cost: Optional[float] = None,
+    rows: Optional[float] = None,
+    helpers: Optional[List[Callable[..., Any]]] = None,
 ) -> NormalFunction:
     """
     Create a :class:`~func.NormalFunction` from the given Python function.
@@ -570,7 +976,36 @@ def create_function(
         language_handler: language handler to run the function in database,
             defaults to plpython3u, will also support plcontainer later.
 
-        schema: schema name
+        schema: schema to install the function persistently. If it is
+            :code:`None`, the function is created as a temporary function
+            in each session. Otherwise, the function is named by the hash
+            of its content and signature, and is reused by all sessions as
+            long as neither of them changes.
+
+        volatility: :code:`"immutable"` if the function always returns the
+            same result for the same arguments, :code:`"stable"` if it does
+            so within a single query, or :code:`"volatile"`, which is the
+            default. This enables the planner to evaluate calls with
+            constant arguments only once, and to use indexes on expressions
+            calling the function.
+
+        parallel: :code:`"safe"`, :code:`"restricted"` or :code:`"unsafe"`,
+            which is the default, to declare whether the function can be run
+            in parallel workers on PostgreSQL. It is ignored on Greenplum.
+
+        strict: whether the function returns :code:`None` without being
+            called when any of the arguments is :code:`None`.
+
+        cost: estimated cost of calling the function, in units of
+            :code:`cpu_operator_cost`. Defaults to 100 for Python functions.
+
+        rows: estimated number of rows returned by the function, only for
+            function returning :code:`List`. Defaults to 1000.
+
+        helpers: self-contained Python functions sent to the server along
+            with the wrapped function. Each of them is stored in :code:`GD`
+            with its name prefixed by :code:`__gp`, e.g. :code:`_load` as
+            :code:`GD["__gp_load"]`, to be shared by all functions calling it.
 
     Returns:
         The newly created :class:`~func.NormalFunction`.
@@ -590,6 +1025,11 @@ def create_function(
             along with all the import statements for dependencies used by the\
             function. In that case, the modules imported need to be installed\
             on server in advance.
+        - An object captured by the wrapped Python function whose pickle is\
+            larger than :code:`config.udf_object_size_threshold`, such as a\
+            fitted model, is stored in database only once for all functions\
+            capturing it, and is loaded by each session on first use. This\
+            requires dill to be installed on the server.
 
     Example:
         .. highlight:: python
@@ -610,14 +1050,39 @@ def create_function(
     """
     # If user needs extra parameters when creating a function
     if wrapped_func is None:
-        return functools.partial(create_function, language_handler=language_handler)
-    return NormalFunction(wrapped_func=wrapped_func, language_handler=language_handler)
+        return functools.partial(
+            create_function,
+            language_handler=language_handler,
+            schema=schema,
+            volatility=volatility,
+            parallel=parallel,
+            strict=strict,
+            cost=cost,
+            rows=rows,
+            helpers=helpers,
+        )
+    return NormalFunction(
+        wrapped_func=wrapped_func,
+        schema=schema,
+        language_handler=language_handler,
+        volatility=volatility,
+        parallel=parallel,
+        strict=strict,
+        cost=cost,
+        rows=rows,
+        helpers=helpers,
+    )
 
 
 # FIXME: Add test cases for optional parameters
 def create_aggregate(
     transition_func: Optional[Callable[..., Any]] = None,
     language_handler: Literal["plpython3u"] = "plpython3u",
+    combine_func: Optional[Union[Callable[..., Any], NormalFunction]] = None,
+    final_func: Optional[Union[Callable[..., Any], NormalFunction]] = None,
+    initial_condition: Optional[str] = None,
+    strict: bool = False,
+    parallel: Optional[Literal["safe", "restricted", "unsafe"]] = None,
 ) -> AggregateFunction:
     """
     Create an :class:`~func.AggregateFunction` from the given Python function.
@@ -631,6 +1096,35 @@ def create_aggregate(
         language_handler : language handler to run the function in database,
             defaults to plpython3u, will also support plcontainer later.
 
+        combine_func : the function combining two states into one, taking and
+            returning the state type. With it, the aggregate can be computed
+            partially on each Greenplum segment or PostgreSQL parallel
+            worker, and the partial states are then combined, rather than
+            moving all rows to one place. The aggregate is marked as parallel
+            safe on PostgreSQL in that case unless :code:`parallel` is
+            given. It can be either a Python
+            function, which is created like :code:`transition_func`, or a
+            :class:`~func.NormalFunction` existing in database, such as
+            :code:`gp.function("int8pl")`.
+
+        final_func : the function computing the result of the aggregate from
+            the final state, in the same forms as :code:`combine_func`. If it
+            is :code:`None`, the final state is the result.
+
+        initial_condition : the initial state in its text representation in
+            database, e.g. :code:`"0"` for :code:`int`. If it is :code:`None`,
+            the initial state is :code:`None`.
+
+        strict : whether the transition function is strict, as the
+            :code:`strict` parameter of :func:`~func.create_function`. Rows
+            with :code:`None` in any argument are then skipped, and if
+            :code:`initial_condition` is :code:`None`, the first non-null
+            value becomes the initial state.
+
+        parallel : parallel safety of the aggregate and the functions created
+            for it, as the :code:`parallel` parameter of
+            :func:`~func.create_function`.
+
     Returns:
         The newly created :class:`~func.AggregateFunction`.
 
@@ -654,17 +1148,53 @@ def create_aggregate(
                  10
             --------
             (1 row)
+
+            >>> @gp.create_aggregate(combine_func=gp.function("int4pl"), initial_condition="0")
+            ... def my_count(cur_count: int, val: int) -> int:
+            ...     return cur_count + 1
+
+            >>> numbers.group_by().assign(result=lambda t: my_count(t["val"]))
+            --------
+             result
+            --------
+                 10
+            --------
+            (1 row)
     """
     # If user needs extra parameters when creating a function
     if transition_func is None:
-        return functools.partial(create_aggregate, language_handler=language_handler)
-    return AggregateFunction(
-        transition_func=NormalFunction(
-            transition_func,
+        return functools.partial(
+            create_aggregate,
+            language_handler=language_handler,
+            combine_func=combine_func,
+            final_func=final_func,
+            initial_condition=initial_condition,
+            strict=strict,
+            parallel=parallel,
+        )
+    if parallel is None and combine_func is not None:
+        parallel = "safe"
+
+    def support_function(
+        func: Optional[Union[Callable[..., Any], NormalFunction]], strict: bool = False
+    ):
+        if func is None or isinstance(func, NormalFunction):
+            return func
+        return NormalFunction(
+            func,
             name="func_" + uuid4().hex,
             schema="pg_temp",
             language_handler=language_handler,
+            parallel=parallel,
+            strict=strict,
         )
+
+    return AggregateFunction(
+        transition_func=support_function(transition_func, strict=strict),
+        combine_func=support_function(combine_func),
+        final_func=support_function(final_func),
+        initial_condition=initial_condition,
+        parallel=parallel,
     )
 
 
@@ -712,23 +1242,158 @@ class ColumnFunction(NormalFunction):
 
         - When the backing database system is PostgreSQL-derived, such as\
             Greenplum, the size of one value cannot be larger than 1 GB. This\
-            limits the size of problems column functions can solve. Currently,\
-            one way to mitigate this issue is to break a large\
-            :class:`~dataframe.DataFrame` into smaller groups and somehow combine\
-            the results of the column function for all groups.
+            limits the size of problems column functions can solve. This can\
+            be mitigated by creating the column function with\
+            :code:`chunk_size` and :code:`reduce_func` in\
+            :func:`~func.create_column_function`, which breaks each group into\
+            chunks of bounded size and combines the results of all chunks.
 
         .. _Additivity: https://en.wikipedia.org/wiki/Sigma-additive_set_function
     """
 
+    def __init__(
+        self,
+        wrapped_func: Callable[..., Any],
+        packed: bool = False,
+        schema: Optional[str] = None,
+        language_handler: Literal["plpython3u"] = "plpython3u",
+        volatility: Optional[Literal["immutable", "stable", "volatile"]] = None,
+        parallel: Optional[Literal["safe", "restricted", "unsafe"]] = None,
+        strict: bool = False,
+        cost: Optional[float] = None,
+    ) -> None:
+        # noqa D107
+        # Packing is set first since it is part of the digest naming the
+        # function if it is persistent.
+        self._packed = packed
+        super().__init__(
+            wrapped_func,
+            schema=schema,
+            language_handler=language_handler,
+            volatility=volatility,
+            parallel=parallel,
+            strict=strict,
+            cost=cost,
+        )
+
+    def _digest(self) -> str:
+        # noqa D400
+        """:meta private:"""
+        return hashlib.sha256(f"{super()._digest()} {self._packed}".encode()).hexdigest()[:32]
+
+    def _params(self) -> List[inspect.Parameter]:
+        # noqa D400
+        """:meta private:"""
+        return list(inspect.signature(self.unwrap()).parameters.values())
+
+    def _packed_params(self) -> List[inspect.Parameter]:
+        # noqa D400
+        """
+        :meta private:
+
+        Return the parameters whose arguments are packed together, i.e. lists
+        of elements of fixed size.
+        """
+        return [
+            param
+            for param in self._params()
+            if getattr(param.annotation, "__origin__", None) in [list, List]
+            and param.annotation.__args__[0] in _packed_element_types
+        ]
+
+    def _serialize_params(self, params: List[inspect.Parameter], db: Database) -> str:
+        # noqa D400
+        """:meta private:"""
+        if not self._packed:
+            return super()._serialize_params(params, db=db)
+        packed_params = self._packed_params()
+        return ",".join(
+            ['"__gp_columns" bytea']
+            + [
+                f'"{param.name}" {self._serialize_param_type(param.annotation, db=db)}'
+                for param in params
+                if param not in packed_params
+            ]
+        )
+
+    def _serialize_call(
+        self, func: str, params: List[inspect.Parameter], return_annotation: Any
+    ) -> str:
+        # noqa D400
+        """:meta private:"""
+        if not self._packed:
+            return super()._serialize_call(func, params, return_annotation)
+        packed_params = self._packed_params()
+        dtypes = [_packed_element_types[param.annotation.__args__[0]][0] for param in packed_params]
+        args = ",".join(
+            [
+                (
+                    f"{param.name}=__gp_columns[{packed_params.index(param)}]"
+                    if param in packed_params
+                    else f"{param.name}={param.name}"
+                )
+                for param in params
+            ]
+        )
+        return (
+            f"(lambda __gp_columns: {func}({args}))"
+            f"(GD['__gp_unpack_columns'](__gp_columns, {dtypes}))"
+        )
+
+    def _helpers(self, func_sig: inspect.Signature) -> List[Callable[..., Any]]:
+        # noqa D400
+        """:meta private:"""
+        helpers = super()._helpers(func_sig)
+        return helpers + [_unpack_columns] if self._packed else helpers
+
     def __call__(self, *args: Any) -> ArrayFunctionExpr:
         """Call the dataframe function with the given arguments."""
         return ArrayFunctionExpr(self, args=args)
 
 
+def _serialize_packed_columns(columns: List[Tuple[Any, type]], db: Optional[Database]) -> str:
+    # noqa D400
+    """
+    :meta private:
+
+    Aggregate the columns into one :code:`bytea` to be unpacked by
+    :func:`~type._unpack_columns`.
+
+    The values are converted to the binary format by the :code:`send`
+    function of their types. A :code:`NULL` is replaced by a zero value and
+    is marked as invalid.
+    """
+    validity = " || ".join(
+        [
+            f"(CASE WHEN ({_serialize_to_expr(column, db=db)}) IS NULL "
+            f"THEN '\\x00'::bytea ELSE '\\x01'::bytea END)"
+            for column, _ in columns
+        ]
+    )
+    values: List[str] = []
+    for column, element_type in columns:
+        _, _, type_name = _packed_element_types[element_type]
+        zero = "false" if element_type is bool else "0"
+        value = f"coalesce(({_serialize_to_expr(column, db=db)})::{type_name}, {zero})"
+        values.append(f"coalesce(string_agg({type_name}send({value}), ''::bytea), ''::bytea)")
+    return " || ".join(
+        ["int4send(count(*)::int4)", f"coalesce(string_agg({validity}, ''::bytea), ''::bytea)"]
+        + values
+    )
+
+
 # FIXME: Add test cases for optional parameters
 def create_column_function(
     wrapped_func: Optional[Callable[..., Any]] = None,
     language_handler: Literal["plpython3u"] = "plpython3u",
+    schema: Optional[str] = None,
+    packed: bool = False,
+    chunk_size: Optional[int] = None,
+    reduce_func: Optional[Callable[..., Any]] = None,
+    volatility: Optional[Literal["immutable", "stable", "volatile"]] = None,
+    parallel: Optional[Literal["safe", "restricted", "unsafe"]] = None,
+    strict: bool = False,
+    cost: Optional[float] = None,
 ) -> ColumnFunction:
     """
     Create an :class:`~func.ColumnFunction` from the given Python function.
@@ -742,6 +1407,37 @@ def create_column_function(
         language_handler : language handler to run the function in database,
             defaults to plpython3u, will also support plcontainer later.
 
+        schema: schema to install the function persistently, as the
+            :code:`schema` parameter of :func:`~func.create_function`.
+
+        packed: whether to pack the columns together. If it is :code:`True`,
+            the arguments of all parameters annotated as :code:`List` of
+            :code:`bool`, :code:`int` or :code:`float` are aggregated into one
+            binary buffer for each group, rather than one array for each
+            column. Inside the function, each of them is a
+            :code:`numpy.ndarray` viewing the buffer without copying, or a
+            :code:`numpy.ma.MaskedArray` if the column contains :code:`NULL`.
+            This reduces the cost of aggregation and conversion. NumPy needs
+            to be installed on the host of the database server.
+
+        chunk_size: maximum number of rows passed to the wrapped function in
+            one call. If it is not :code:`None`, each group is broken into
+            chunks of at most :code:`chunk_size` rows, the wrapped function is
+            called on each chunk in parallel on the segments to compute a
+            partial result, and :code:`reduce_func` is called on the list of
+            partial results to compute the result of the group. This makes it
+            possible to operate on groups larger than the size limit of one
+            value.
+
+        reduce_func: the Python function combining the partial results,
+            required if and only if :code:`chunk_size` is set. It takes a
+            :code:`List` of the return type of :code:`wrapped_func` and
+            follows the same convention as :code:`wrapped_func`.
+
+        volatility, parallel, strict, cost: properties of the function
+            declared to the planner, as the parameters of the same names of
+            :func:`~func.create_function`.
+
     Returns:
         The newly created :class:`~func.ColumnFunction`.
 
@@ -764,8 +1460,443 @@ def create_column_function(
                  Length: 3, Sum: 6
                 -------------------
                 (1 row)
+
+                >>> def add_up(partial_sums: List[int]) -> int:
+                ...     return sum(partial_sums)
+
+                >>> @gp.create_column_function(chunk_size=2, reduce_func=add_up)
+                ... def my_sum(val_list: List[int]) -> int:
+                ...     return sum(val_list)
+
+                >>> numbers.group_by().apply(lambda t: my_sum(t["val"]), column_name="sum")
+                -----
+                 sum
+                -----
+                   6
+                -----
+                (1 row)
     """
     # If user needs extra parameters when creating a function
     if wrapped_func is None:
-        return functools.partial(create_column_function, language_handler=language_handler)
-    return ColumnFunction(wrapped_func=wrapped_func, language_handler=language_handler)
+        return functools.partial(
+            create_column_function,
+            language_handler=language_handler,
+            schema=schema,
+            packed=packed,
+            chunk_size=chunk_size,
+            reduce_func=reduce_func,
+            volatility=volatility,
+            parallel=parallel,
+            strict=strict,
+            cost=cost,
+        )
+    assert (chunk_size is None) == (
+        reduce_func is None
+    ), "Chunk size and reduce function must be given together."
+    if chunk_size is not None:
+        assert reduce_func is not None
+        return ChunkedColumnFunction(
+            wrapped_func=wrapped_func,
+            reduce_func=reduce_func,
+            chunk_size=chunk_size,
+            packed=packed,
+            schema=schema,
+            language_handler=language_handler,
+            volatility=volatility,
+            parallel=parallel,
+            strict=strict,
+            cost=cost,
+        )
+    return ColumnFunction(
+        wrapped_func=wrapped_func,
+        packed=packed,
+        schema=schema,
+        language_handler=language_handler,
+        volatility=volatility,
+        parallel=parallel,
+        strict=strict,
+        cost=cost,
+    )
+
+
+def _batch(
+    dataframe: DataFrame,
+    targets: List[str],
+    batch_size: int,
+    db: Database,
+    grouping_col_names: Optional[List[str]] = None,
+) -> DataFrame:
+    # noqa D400
+    """
+    :meta private:
+
+    Returns the :class:`DataFrame` with :code:`targets` computed on each batch
+    of at most :code:`batch_size` rows of :code:`dataframe`.
+
+    The rows are batched on each segment, without being gathered to one place,
+    and only rows of the same group are batched together. In :code:`targets`,
+    columns are referred to as columns of :code:`dataframe` and rows are
+    numbered in each batch by :code:`__gp_row`, e.g. for ordering aggregates.
+    """
+    partition_col_names = ["__gp_seg"] + (grouping_col_names if grouping_col_names else [])
+    segment_id = "gp_execution_segment()" if db._is_variant("greenplum") else "0"
+    segmented = DataFrame(
+        f"SELECT *, {segment_id} AS __gp_seg FROM {dataframe._name}",
+        parents=[dataframe],
+    )
+    numbered = DataFrame(
+        f"""
+            SELECT *, row_number() OVER (
+                PARTITION BY {','.join(partition_col_names)}
+            ) AS __gp_row
+            FROM {segmented._name}
+        """,
+        parents=[segmented],
+    )
+    # Aliasing makes the targets, which refer to the columns of the original
+    # dataframe, refer to the same columns of the numbered one.
+    return DataFrame(
+        f"""
+            SELECT {','.join(targets)}
+            FROM {numbered._name} AS {dataframe._name}
+            GROUP BY {','.join(partition_col_names)}, (__gp_row - 1) / {batch_size}
+        """,
+        parents=[numbered],
+    )
+
+
+class ChunkedFunctionExpr(ArrayFunctionExpr):
+    """
+    Inherited from :class:`~func.ArrayFunctionExpr`.
+
+    Specialized for a :class:`~func.ChunkedColumnFunction`, which can only be
+    applied with :meth:`~dataframe.DataFrame.apply` or
+    :meth:`~group.DataFrameGroupingSet.apply`.
+    """
+
+    def _serialize(self, db: Optional[Database] = None) -> str:
+        # noqa D400
+        """:meta private:"""
+        raise Exception("Chunked column function can only be called by apply().")
+
+    def _bind(
+        self,
+        group_by: Optional[DataFrameGroupingSet] = None,
+        dataframe: Optional[DataFrame] = None,
+    ):
+        # noqa D400
+        """:meta private:"""
+        return ChunkedFunctionExpr(
+            self._func,
+            self._args,
+            group_by=group_by if group_by else self._group_by,
+            dataframe=dataframe,
+        )
+
+    def apply(
+        self, expand: bool = False, column_name: Optional[str] = None, db: Optional[Database] = None
+    ) -> DataFrame:
+        # noqa D400
+        """
+        :meta private:
+
+        Returns the :class:`DataFrame` with the result of the reduce function
+        applied to the partial results of all chunks in each group.
+        """
+        assert self._dataframe is not None, "Arguments of chunked column function must be columns."
+        assert db is not None
+        function = self._function
+        assert isinstance(function, ChunkedColumnFunction)
+        assert (
+            self._group_by is None or len(self._group_by._grouping_sets) == 1
+        ), "Chunked column function cannot be applied to more than one grouping set."
+        grouping_col_names = self._group_by._flatten() if self._group_by is not None else []
+        # Compute the partial results of chunks without gathering each group
+        # to one place.
+        map_call = ArrayFunctionExpr(
+            function, self._args, group_by=self._group_by, dataframe=self._dataframe
+        )
+        partials = _batch(
+            self._dataframe,
+            grouping_col_names + [f"{_serialize_to_expr(map_call, db=db)} AS __gp_partial"],
+            function._chunk_size,
+            db,
+            grouping_col_names=grouping_col_names,
+        )
+        reduce_call = ArrayFunctionExpr(
+            function._reduce_func,
+            (partials["__gp_partial"],),
+            group_by=(
+                partials.group_by(*grouping_col_names) if self._group_by is not None else None
+            ),
+            dataframe=partials,
+        )
+        return reduce_call.apply(expand=expand, column_name=column_name, db=db)
+
+
+class ChunkedColumnFunction(ColumnFunction):
+    """
+    Represent a dataframe column function operating on chunks of each group.
+
+    Rather than gathering all rows of a group into one value, a
+    :class:`~func.ChunkedColumnFunction` breaks each group into chunks of
+    bounded size on each segment. The wrapped function, as the *map* function,
+    is called on each chunk in parallel to compute a partial result. Then the
+    *reduce* function is called on the list of partial results to compute the
+    result of the group.
+
+    As a result, the size of a group is not limited by the size of one value,
+    as long as the partial results are small enough.
+    """
+
+    def __init__(
+        self,
+        wrapped_func: Callable[..., Any],
+        reduce_func: Callable[..., Any],
+        chunk_size: int,
+        packed: bool = False,
+        schema: Optional[str] = None,
+        language_handler: Literal["plpython3u"] = "plpython3u",
+        volatility: Optional[Literal["immutable", "stable", "volatile"]] = None,
+        parallel: Optional[Literal["safe", "restricted", "unsafe"]] = None,
+        strict: bool = False,
+        cost: Optional[float] = None,
+    ) -> None:
+        # noqa D107
+        super().__init__(
+            wrapped_func,
+            packed=packed,
+            schema=schema,
+            language_handler=language_handler,
+            volatility=volatility,
+            parallel=parallel,
+            strict=strict,
+            cost=cost,
+        )
+        assert chunk_size > 0, "Chunk size must be positive."
+        self._chunk_size = chunk_size
+        self._reduce_func = ColumnFunction(
+            reduce_func,
+            schema=schema,
+            language_handler=language_handler,
+            volatility=volatility,
+            parallel=parallel,
+            strict=strict,
+            cost=cost,
+        )
+
+    def __call__(self, *args: Any) -> ChunkedFunctionExpr:
+        """Call the dataframe function with the given arguments."""
+        return ChunkedFunctionExpr(self, args=args)
+
+
+class VectorizedFunctionExpr(FunctionExpr):
+    """
+    Inherited from :class:`~func.FunctionExpr`.
+
+    Specialized for a :class:`~func.VectorizedFunction`, which can only be
+    applied to a :class:`~dataframe.DataFrame` with :meth:`~dataframe.DataFrame.apply`.
+    """
+
+    def _serialize(self, db: Optional[Database] = None) -> str:
+        # noqa D400
+        """:meta private:"""
+        raise Exception("Vectorized function can only be called by DataFrame.apply().")
+
+    def _bind(
+        self,
+        group_by: Optional[DataFrameGroupingSet] = None,
+        dataframe: Optional[DataFrame] = None,
+    ):
+        # noqa D400
+        """:meta private:"""
+        return VectorizedFunctionExpr(
+            self._func,
+            self._args,
+            group_by=group_by,
+            dataframe=dataframe,
+        )
+
+    def apply(
+        self, expand: bool = False, column_name: Optional[str] = None, db: Optional[Database] = None
+    ) -> DataFrame:
+        # noqa D400
+        """
+        :meta private:
+
+        Returns the :class:`DataFrame` with the result of the function appended
+        as a new column to each row of the arguments' :class:`DataFrame`.
+        """
+        assert not expand, "Cannot expand the results of vectorized function."
+        assert self._group_by is None, "Vectorized function cannot be applied to groups."
+        assert self._dataframe is not None, "Arguments of vectorized function must be columns."
+        assert db is not None
+        function = self._function
+        assert isinstance(function, VectorizedFunction)
+        function._create_in_db(db)
+        if column_name is None:
+            column_name = function._name
+        schema = self._dataframe.describe()
+        # Rows are aggregated along with the arguments so that each result is
+        # matched with its row when the batch is unnested.
+        row_string = ",".join([f'{self._dataframe._name}."{name}"' for name in schema])
+        args_string = ",".join(
+            [f"array_agg({_serialize_to_expr(arg, db=db)} ORDER BY __gp_row)" for arg in self._args]
+        )
+        batches = _batch(
+            self._dataframe,
+            [
+                f"array_agg(ROW({row_string}) ORDER BY __gp_row) AS __gp_rows",
+                f"{function._qualified_name_str}({args_string}) AS __gp_results",
+            ],
+            function._batch_size,
+            db,
+        )
+        column_defs = ",".join([f'"{name}" {type_name}' for name, type_name in schema.items()])
+        column_aliases = ",".join([f'"{name}"' for name in list(schema) + [column_name]])
+        return DataFrame(
+            f"""
+                SELECT __gp_batch.*
+                FROM {batches._name}, ROWS FROM (
+                    unnest(__gp_rows) AS ({column_defs}), unnest(__gp_results)
+                ) AS __gp_batch({column_aliases})
+            """,
+            parents=[batches],
+        )
+
+
+class VectorizedFunction(NormalFunction):
+    """
+    Represent a vectorized dataframe function.
+
+    A :class:`~func.VectorizedFunction` is mapped to a UDF in database like a
+    :class:`~func.NormalFunction`. However, rather than being called once for
+    each row, it is called once for each batch of rows. Each argument is
+    passed as a :code:`numpy.ndarray` containing the values of the batch, and
+    the function returns a :code:`numpy.ndarray`, or any sequence, of the same
+    length with one result for each row.
+
+    This saves the per-call overhead of the Python interpreter and allows
+    exploiting the SIMD optimizations in NumPy. The rows are batched on each
+    segment, without being gathered to one place.
+    """
+
+    def __init__(
+        self,
+        wrapped_func: Callable[..., Any],
+        batch_size: int,
+        schema: Optional[str] = None,
+        language_handler: Literal["plpython3u"] = "plpython3u",
+        helpers: Optional[List[Callable[..., Any]]] = None,
+    ) -> None:
+        # noqa D107
+        super().__init__(
+            wrapped_func, schema=schema, language_handler=language_handler, helpers=helpers
+        )
+        assert batch_size > 0, "Batch size must be positive."
+        self._batch_size = batch_size
+
+    def _serialize_param_type(self, annotation: Any, db: Database) -> str:
+        # noqa D400
+        """:meta private:"""
+        return _serialize_to_type(annotation, db=db) + "[]"
+
+    def _serialize_return_type(self, annotation: Any, db: Database) -> str:
+        # noqa D400
+        """:meta private:"""
+        return _serialize_to_type(annotation, db=db) + "[]"
+
+    def _serialize_call(
+        self, func: str, params: List[inspect.Parameter], return_annotation: Any
+    ) -> str:
+        # noqa D400
+        """:meta private:"""
+        numpy = "__import__('numpy')"
+        args = ",".join([f"{param.name}={numpy}.asarray({param.name})" for param in params])
+        return f"{numpy}.asarray({func}({args})).tolist()"
+
+    def __call__(self, *args: Any) -> VectorizedFunctionExpr:
+        """Call the dataframe function with the given arguments."""
+        return VectorizedFunctionExpr(self, args=args)
+
+
+def create_vectorized_function(
+    wrapped_func: Optional[Callable[..., Any]] = None,
+    batch_size: int = 10000,
+    language_handler: Literal["plpython3u"] = "plpython3u",
+    schema: Optional[str] = None,
+    helpers: Optional[List[Callable[..., Any]]] = None,
+) -> VectorizedFunction:
+    """
+    Create a :class:`~func.VectorizedFunction` from the given Python function.
+
+    Args:
+        wrapped_func: the wrapped Python function carrying out computation on
+            batches of rows. It needs to follow the same convention as the
+            :code:`wrapped_func` parameter of :func:`~func.create_function`,
+            except that the parameters and the return value are annotated
+            with the type of **each element** rather than the array, and that
+            it takes and returns :code:`numpy.ndarray`. :code:`NULL` values are
+            passed as :code:`None`.
+        batch_size: maximum number of rows in each batch.
+        language_handler : language handler to run the function in database,
+            defaults to plpython3u, will also support plcontainer later.
+        schema: schema to install the function persistently, as the
+            :code:`schema` parameter of :func:`~func.create_function`.
+        helpers: helper functions sent to the server, as the
+            :code:`helpers` parameter of :func:`~func.create_function`.
+
+    Returns:
+        The newly created :class:`~func.VectorizedFunction`.
+
+    Note:
+        NumPy needs to be installed on the host of the database server.
+
+    Example:
+        .. highlight:: python
+        .. code-block::  Python
+
+            >>> @gp.create_vectorized_function(batch_size=2)
+            ... def scale(val: float, factor: float) -> float:
+            ...     return val * factor
+
+            >>> numbers = db.create_dataframe(columns={"val": [1.0, 2.0, 3.0]})
+            >>> results = numbers.apply(lambda t: scale(t["val"], 10.0), column_name="scaled")
+            >>> results.order_by("val")[:]
+            --------------
+             val | scaled
+            -----+--------
+             1.0 |     10
+             2.0 |     20
+             3.0 |     30
+            --------------
+            (3 rows)
+    """
+    # If user needs extra parameters when creating a function
+    if wrapped_func is None:
+        return functools.partial(
+            create_vectorized_function,
+            batch_size=batch_size,
+            language_handler=language_handler,
+            schema=schema,
+            helpers=helpers,
+        )
+    return VectorizedFunction(
+        wrapped_func,
+        batch_size=batch_size,
+        schema=schema,
+        language_handler=language_handler,
+        helpers=helpers,
+    )
+
+
+@create_function
+def _warm_up(statements: List[str]) -> float:
+    import sys
+    import time
+
+    plpy = sys.modules["plpy"]
+    start = time.perf_counter()
+    for statement in statements:
+        plpy.execute(statement)
+    return (time.perf_counter() - start) * 1000
@@ -0,0 +1,426 @@
+"""
+This module contains utilities for monitoring the queries sent to database.
+
+Every SQL statement executed by a :class:`~db.Database` emits an event when it
+starts and another when it ends. A :class:`~monitor.QueryListener` registered
+with :meth:`~db.Database.add_listener` receives the events, e.g. to send the
+latency of each query to a monitoring system.
+
+:class:`~monitor.QueryStatistics` is a built-in listener that aggregates the
+statistics of queries of the same shape, i.e. the same query with different
+constants.
+
+:class:`~monitor.QueryHistory` is another built-in listener that keeps the
+latency of queries in a local SQLite file, so that the performance can be
+tracked across sessions and a query getting slower can be detected.
+"""
+import hashlib
+import re
+import sqlite3
+import statistics
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+
+from greenplumpython.db import _canonicalize
+
+if TYPE_CHECKING:
+    from greenplumpython.dataframe import DataFrame
+
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMERIC_LITERAL_PATTERN = re.compile(r"\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_LITERAL_LIST_PATTERN = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def _normalize(query: str) -> str:
+    # noqa: D400
+    """
+    :meta private:
+
+    Return the shape of the query, with CTE names normalized and constants
+    replaced by :code:`?`.
+    """
+    query = _STRING_LITERAL_PATTERN.sub("?", _canonicalize(query))
+    query = _NUMERIC_LITERAL_PATTERN.sub("?", query)
+    return _LITERAL_LIST_PATTERN.sub("?", " ".join(query.split()))
+
+
+def _fingerprint(shape: str) -> str:
+    # noqa: D400
+    """
+    :meta private:
+
+    Return a hash identifying the shape of a query returned by :func:`_normalize`.
+    """
+    return hashlib.sha1(shape.encode()).hexdigest()[:16]
+
+
+class QueryEvent:
+    """
+    Representation of the execution of a SQL statement.
+
+    The same object is passed to :meth:`~monitor.QueryListener.on_query_start`
+    and :meth:`~monitor.QueryListener.on_query_end`. The attributes about the
+    result are set only when the execution ends.
+
+    Attributes:
+        sql: text of the SQL statement.
+        dataframe: the :class:`~dataframe.DataFrame` that the statement is
+            executed for, if any.
+        start_time: time when the execution starts, in seconds since the epoch.
+        duration: time spent on the execution in seconds.
+        rowcount: number of rows returned or affected by the statement.
+        bytes_sent: size of the SQL statement sent to database in bytes.
+        bytes_received: size of the result received from database in bytes,
+            as the length of the text of all values.
+        error: the exception raised by the execution, if any.
+    """
+
+    def __init__(self, sql: str, dataframe: Optional["DataFrame"] = None) -> None:
+        # noqa: D107
+        self.sql = sql
+        self.dataframe = dataframe
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.rowcount: Optional[int] = None
+        self.bytes_sent = len(sql.encode())
+        self.bytes_received: Optional[int] = None
+        self.error: Optional[Exception] = None
+        self._shape: Optional[str] = None
+        self._start_counter = time.perf_counter()
+
+    @property
+    def shape(self) -> str:
+        """Return the SQL statement with CTE names normalized and constants replaced by :code:`?`."""
+        if self._shape is None:
+            self._shape = _normalize(self.sql)
+        return self._shape
+
+    @property
+    def fingerprint(self) -> str:
+        """Return a hash identifying the shape of the SQL statement."""
+        return _fingerprint(self.shape)
+
+    def _end(
+        self,
+        rowcount: int,
+        result: Union[Iterable[Dict[str, Any]], int, None] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.duration = time.perf_counter() - self._start_counter
+        self.rowcount = rowcount
+        self.error = error
+        if isinstance(result, list):
+            self.bytes_received = sum(
+                [
+                    len(str(val))
+                    for row in result
+                    if isinstance(row, dict)
+                    for val in row.values()
+                    if val is not None
+                ]
+            )
+
+
+class QueryListener:
+    """
+    Base class of listeners to the execution of SQL statements.
+
+    Subclass it and override the methods of interest, then register an
+    instance with :meth:`~db.Database.add_listener`.
+    """
+
+    def on_query_start(self, event: QueryEvent) -> None:
+        """Handle the event that a SQL statement starts to execute."""
+        pass
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        """Handle the event that a SQL statement ends, either successfully or with an error."""
+        pass
+
+
+class QueryShape:
+    """
+    Aggregated statistics of SQL statements of the same shape.
+
+    Attributes:
+        fingerprint: hash identifying the shape.
+        sql: SQL statement of the shape with constants replaced by :code:`?`.
+        calls: number of executions.
+        errors: number of executions ended with errors.
+        total_time: total time of all executions in seconds.
+        min_time: minimum time of one execution in seconds.
+        max_time: maximum time of one execution in seconds.
+        rows: total number of rows returned or affected.
+        bytes_received: total size of results received in bytes.
+    """
+
+    def __init__(self, fingerprint: str, sql: str) -> None:
+        # noqa: D107
+        self.fingerprint = fingerprint
+        self.sql = sql
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.min_time = float("inf")
+        self.max_time = 0.0
+        self.rows = 0
+        self.bytes_received = 0
+
+    @property
+    def mean_time(self) -> float:
+        """Return the average time of one execution in seconds."""
+        return self.total_time / self.calls if self.calls > 0 else 0.0
+
+
+class QueryStatistics(QueryListener):
+    """
+    A :class:`~monitor.QueryListener` aggregating statistics for each shape of SQL statements.
+
+    Example:
+        .. highlight:: python
+        .. code-block::  Python
+
+            >>> from greenplumpython.monitor import QueryStatistics
+            >>> stats = QueryStatistics()
+            >>> db.add_listener(stats)
+            >>> df = db.create_dataframe(columns={"id": range(10)})
+            >>> for i in range(3):
+            ...     _ = list(df[lambda t: t["id"] > i])
+            >>> [shape.calls for shape in stats.shapes]
+            [3]
+            >>> db.remove_listener(stats)
+    """
+
+    def __init__(self) -> None:
+        # noqa: D107
+        self._shapes: Dict[str, QueryShape] = {}
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        # noqa: D102
+        fingerprint = event.fingerprint
+        if fingerprint not in self._shapes:
+            self._shapes[fingerprint] = QueryShape(fingerprint, event.shape)
+        shape = self._shapes[fingerprint]
+        assert event.duration is not None
+        shape.calls += 1
+        shape.errors += 1 if event.error is not None else 0
+        shape.total_time += event.duration
+        shape.min_time = min(shape.min_time, event.duration)
+        shape.max_time = max(shape.max_time, event.duration)
+        shape.rows += max(event.rowcount or 0, 0)
+        shape.bytes_received += event.bytes_received or 0
+
+    @property
+    def shapes(self) -> List[QueryShape]:
+        """Return statistics of all shapes, with the most time consuming first."""
+        return sorted(self._shapes.values(), key=lambda shape: shape.total_time, reverse=True)
+
+    def reset(self) -> None:
+        """Discard all statistics collected."""
+        self._shapes.clear()
+
+    def __repr__(self) -> str:
+        # noqa: D105
+        lines = ["fingerprint      | calls | total (s) | mean (s) | max (s) | rows | sql"]
+        for shape in self.shapes:
+            sql = shape.sql if len(shape.sql) <= 60 else shape.sql[:57] + "..."
+            lines.append(
+                f"{shape.fingerprint} | {shape.calls:5d} | {shape.total_time:9.3f} |"
+                f" {shape.mean_time:8.3f} | {shape.max_time:7.3f} | {shape.rows:4d} | {sql}"
+            )
+        return "\n".join(lines)
+
+
+class QueryRegression:
+    """
+    A shape of SQL statements whose latency has grown compared to the baseline.
+
+    Attributes:
+        fingerprint: hash identifying the shape.
+        sql: SQL statement of the shape with constants replaced by :code:`?`.
+        baseline_time: median time of one execution in the baseline in seconds.
+        recent_time: median time of one execution in the recent runs in seconds.
+        baseline_calls: number of executions in the baseline.
+        recent_calls: number of executions in the recent runs.
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        sql: str,
+        baseline_times: List[float],
+        recent_times: List[float],
+    ) -> None:
+        # noqa: D107
+        self.fingerprint = fingerprint
+        self.sql = sql
+        self.baseline_time = statistics.median(baseline_times)
+        self.recent_time = statistics.median(recent_times)
+        self.baseline_calls = len(baseline_times)
+        self.recent_calls = len(recent_times)
+
+    @property
+    def ratio(self) -> float:
+        """Return how many times the recent runs are slower than the baseline."""
+        return self.recent_time / self.baseline_time if self.baseline_time > 0 else float("inf")
+
+    def __repr__(self) -> str:
+        # noqa: D105
+        return (
+            f"{self.fingerprint}: {self.baseline_time:.3f}s -> {self.recent_time:.3f}s"
+            f" ({self.ratio:.2f}x) {self.sql}"
+        )
+
+
+class QueryHistory(QueryListener):
+    """
+    A :class:`~monitor.QueryListener` recording the latency of SQL statements in a SQLite file.
+
+    Each execution is recorded with the fingerprint of its shape, the time
+    spent and the number of rows. Since the history is kept in a local file,
+    it can be shared by many sessions, e.g. for detecting regressions after
+    the data or the code has changed.
+
+    Args:
+        path: path of the SQLite file. The file is created if it does not
+            exist. Use :code:`":memory:"` to keep the history only in memory.
+        label: label attached to the executions recorded, such as the version
+            of the code, for comparing the runs labeled differently.
+
+    Example:
+        .. highlight:: python
+        .. code-block::  Python
+
+            >>> from greenplumpython.monitor import QueryHistory
+            >>> history = QueryHistory(":memory:")
+            >>> db.add_listener(history)
+            >>> df = db.create_dataframe(columns={"id": range(10)})
+            >>> for _ in range(3):
+            ...     _ = list(df)
+            >>> db.remove_listener(history)
+            >>> history.compare(recent=1, min_calls=1, threshold=float("inf"))
+            []
+            >>> history.close()
+    """
+
+    def __init__(self, path: str, label: Optional[str] = None) -> None:
+        # noqa: D107
+        self._label = label
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        # WAL avoids syncing to disk on every execution recorded.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_shape (
+                fingerprint TEXT PRIMARY KEY,
+                sql TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_history (
+                fingerprint TEXT NOT NULL,
+                label TEXT,
+                start_time REAL NOT NULL,
+                duration REAL NOT NULL,
+                rowcount INTEGER,
+                failed INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS query_history_fingerprint"
+            " ON query_history (fingerprint, start_time)"
+        )
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        # noqa: D102
+        fingerprint = event.fingerprint
+        self._conn.execute(
+            "INSERT OR IGNORE INTO query_shape VALUES (?, ?)",
+            (fingerprint, event.shape),
+        )
+        self._conn.execute(
+            "INSERT INTO query_history VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                fingerprint,
+                self._label,
+                event.start_time,
+                event.duration,
+                event.rowcount,
+                event.error is not None,
+            ),
+        )
+
+    def compare(
+        self,
+        recent: int = 10,
+        threshold: float = 1.5,
+        min_calls: int = 3,
+        baseline_label: Optional[str] = None,
+        recent_label: Optional[str] = None,
+    ) -> List[QueryRegression]:
+        """
+        Compare the latency of recent runs against the baseline and report regressions.
+
+        For each shape of SQL statements, by default, the :code:`recent` latest
+        successful executions are compared against all the earlier ones. If
+        both :code:`baseline_label` and :code:`recent_label` are given, the
+        executions recorded with the two labels are compared instead.
+
+        Args:
+            recent: number of latest executions of each shape regarded as recent.
+            threshold: minimum ratio of the median latency of recent runs to
+                that of the baseline for a shape to be reported.
+            min_calls: minimum number of executions in both the baseline and the
+                recent runs for a shape to be compared.
+            baseline_label: label of the executions in the baseline.
+            recent_label: label of the executions regarded as recent.
+
+        Returns:
+            The regressions found, with the largest slowdown first.
+        """
+        assert (baseline_label is None) == (
+            recent_label is None
+        ), "Labels of both the baseline and the recent runs are required."
+        rows = self._conn.execute(
+            """
+            SELECT fingerprint, sql, label, duration
+            FROM query_history JOIN query_shape USING (fingerprint)
+            WHERE NOT failed
+            ORDER BY fingerprint, start_time DESC
+            """
+        ).fetchall()
+        shapes: Dict[str, str] = {}
+        baseline_times: Dict[str, List[float]] = {}
+        recent_times: Dict[str, List[float]] = {}
+        for fingerprint, sql, label, duration in rows:
+            shapes[fingerprint] = sql
+            if recent_label is not None:
+                if label == recent_label:
+                    recent_times.setdefault(fingerprint, []).append(duration)
+                elif label == baseline_label:
+                    baseline_times.setdefault(fingerprint, []).append(duration)
+            elif len(recent_times.setdefault(fingerprint, [])) < recent:
+                recent_times[fingerprint].append(duration)
+            else:
+                baseline_times.setdefault(fingerprint, []).append(duration)
+        regressions = [
+            QueryRegression(
+                fingerprint, sql, baseline_times[fingerprint], recent_times[fingerprint]
+            )
+            for fingerprint, sql in shapes.items()
+            if len(baseline_times.get(fingerprint, [])) >= min_calls
+            and len(recent_times.get(fingerprint, [])) >= min_calls
+        ]
+        return sorted(
+            [regression for regression in regressions if regression.ratio >= threshold],
+            key=lambda regression: regression.ratio,
+            reverse=True,
+        )
+
+    def close(self) -> None:
+        """Close the SQLite file of the history."""
+        self._conn.close()
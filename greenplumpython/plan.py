@@ -0,0 +1,330 @@
+"""
+This module contains classes for representing the plan of a :class:`~dataframe.DataFrame`.
+
+A plan is obtained by calling :meth:`~dataframe.DataFrame.explain()`. It is a
+tree of :class:`~plan.PlanNode`, each of which is one step that the database
+takes to compute the data, such as scanning a table, joining two inputs, or,
+on Greenplum, moving data between segments with a *Motion*.
+
+Each node carries the estimates made by the planner, and the actual numbers
+measured if the plan is obtained with :code:`analyze=True`.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+
+class PlanNode:
+    """Representation of a node in the plan tree."""
+
+    def __init__(self, properties: Dict[str, Any]) -> None:
+        # noqa: D400
+        """:meta private:"""
+        self._properties = {k: v for k, v in properties.items() if k != "Plans"}
+        self._children = [PlanNode(child) for child in properties.get("Plans", [])]
+
+    def __getitem__(self, key: str) -> Any:
+        """
+        Get a property of the node as is in the output of :code:`EXPLAIN`.
+
+        Args:
+            key: name of the property, such as :code:`"Relation Name"`.
+        """
+        return self._properties[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a property of the node, or :code:`default` if it does not exist."""
+        return self._properties.get(key, default)
+
+    @property
+    def properties(self) -> Dict[str, Any]:
+        """Return all properties of the node, excluding the children."""
+        return self._properties
+
+    @property
+    def children(self) -> List["PlanNode"]:
+        """Return the child nodes, i.e. inputs, of the node."""
+        return self._children
+
+    @property
+    def node_type(self) -> str:
+        """Return the type of the node, such as :code:`"Seq Scan"` or :code:`"Hash Join"`."""
+        return self._properties["Node Type"]
+
+    @property
+    def startup_cost(self) -> float:
+        """Return the estimated cost before the first row can be returned."""
+        return self._properties["Startup Cost"]
+
+    @property
+    def total_cost(self) -> float:
+        """Return the estimated cost to return all rows."""
+        return self._properties["Total Cost"]
+
+    @property
+    def estimated_rows(self) -> float:
+        """Return the estimated number of rows returned by the node."""
+        return self._properties["Plan Rows"]
+
+    @property
+    def actual_rows(self) -> Optional[float]:
+        """Return the actual number of rows returned per loop, if analyzed."""
+        return self._properties.get("Actual Rows")
+
+    @property
+    def actual_loops(self) -> Optional[int]:
+        """Return the actual number of times the node is executed, if analyzed."""
+        return self._properties.get("Actual Loops")
+
+    @property
+    def actual_time(self) -> Optional[float]:
+        """Return the actual time in milliseconds to return all rows per loop, if analyzed."""
+        return self._properties.get("Actual Total Time")
+
+    @property
+    def slice(self) -> Optional[int]:
+        """Return the Greenplum slice executing the node, or :code:`None` on PostgreSQL."""
+        return self._properties.get("Slice")
+
+    @property
+    def is_motion(self) -> bool:
+        """Check whether the node moves data between Greenplum segments."""
+        return self.node_type.endswith("Motion")
+
+    def walk(self) -> Iterator["PlanNode"]:
+        """Iterate over the node and all its descendants in pre-order."""
+        yield self
+        for child in self._children:
+            yield from child.walk()
+
+    def _format(self, depth: int) -> str:
+        label = self.node_type
+        for key in ["Relation Name", "CTE Name", "Function Name"]:
+            if key in self._properties:
+                label += f" on {self._properties[key]}"
+        details = (
+            f"cost={self.startup_cost:.2f}..{self.total_cost:.2f} rows={self.estimated_rows:.0f}"
+        )
+        if self.actual_rows is not None:
+            details += f"; actual time={self.actual_time:.3f} rows={self.actual_rows:.0f}"
+            details += f" loops={self.actual_loops}"
+        if self.slice is not None:
+            details += f"; slice={self.slice}"
+        prefix = "  " * depth + ("-> " if depth > 0 else "")
+        lines = [f"{prefix}{label}  ({details})"]
+        lines += [child._format(depth + 1) for child in self._children]
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        # noqa: D105
+        return self._format(0)
+
+
+class Plan:
+    """
+    Representation of the plan of a :class:`~dataframe.DataFrame`.
+
+    Example:
+        .. highlight:: python
+        .. code-block::  Python
+
+            >>> df = db.create_dataframe(rows=[(i,) for i in range(10)], column_names=["id"])
+            >>> plan = df[lambda t: t["id"] > 5].explain(analyze=True)
+            >>> plan.root.total_cost > 0
+            True
+            >>> plan.execution_time is not None
+            True
+    """
+
+    def __init__(self, result: Dict[str, Any]) -> None:
+        # noqa: D400
+        """:meta private:"""
+        self._properties = {k: v for k, v in result.items() if k != "Plan"}
+        self._root = PlanNode(result["Plan"])
+
+    @property
+    def root(self) -> PlanNode:
+        """Return the root node of the plan tree."""
+        return self._root
+
+    @property
+    def properties(self) -> Dict[str, Any]:
+        """Return the properties of the whole plan, such as :code:`"Slice statistics"` on Greenplum."""
+        return self._properties
+
+    @property
+    def planning_time(self) -> Optional[float]:
+        """Return the time in milliseconds spent on planning, if analyzed."""
+        return self._properties.get("Planning Time")
+
+    @property
+    def execution_time(self) -> Optional[float]:
+        """Return the time in milliseconds spent on execution, if analyzed."""
+        return self._properties.get("Execution Time")
+
+    def nodes(self) -> Iterator[PlanNode]:
+        """Iterate over all nodes of the plan tree in pre-order."""
+        return self._root.walk()
+
+    @property
+    def motions(self) -> List[PlanNode]:
+        """Return all Motion nodes, which is empty on PostgreSQL."""
+        return [node for node in self.nodes() if node.is_motion]
+
+    @property
+    def slices(self) -> Dict[int, List[PlanNode]]:
+        """Return nodes grouped by the Greenplum slice executing them."""
+        slices: Dict[int, List[PlanNode]] = {}
+        for node in self.nodes():
+            if node.slice is not None:
+                slices.setdefault(node.slice, []).append(node)
+        return slices
+
+    def __repr__(self) -> str:
+        # noqa: D105
+        lines = [repr(self._root)]
+        if self.planning_time is not None:
+            lines.append(f"Planning Time: {self.planning_time:.3f} ms")
+        if self.execution_time is not None:
+            lines.append(f"Execution Time: {self.execution_time:.3f} ms")
+        return "\n".join(lines)
+
+
+# Properties in kB reporting memory used by a node.
+_MEMORY_PROPERTIES = ["Peak Memory Usage", "Sort Space Used", "Memory Used"]
+
+
+class ProfileStep:
+    """
+    Resources consumed by one step, i.e. one :class:`~dataframe.DataFrame`, in the lineage.
+
+    Attributes:
+        name: name of the :class:`~dataframe.DataFrame` in the query, i.e. :code:`cte_<uuid>`.
+        operation: the method that created the :class:`~dataframe.DataFrame`, such as
+            :code:`assign`.
+        call_site: location in the Python code that called the method, if known.
+        time: time in milliseconds spent on the step itself, excluding its inputs.
+            :code:`None` if the step is not visible in the plan, e.g. merged
+            into another step by the planner.
+        rows: number of rows returned by the step.
+        memory: memory in kB used by the step as reported by the database.
+        nodes: nodes of the plan attributed to the step.
+    """
+
+    def __init__(self, name: str, operation: Optional[str], call_site: Optional[str]) -> None:
+        # noqa: D107
+        self.name = name
+        self.operation = operation
+        self.call_site = call_site
+        self.time: Optional[float] = None
+        self.rows: Optional[float] = None
+        self.memory: Optional[float] = None
+        self.nodes: List[PlanNode] = []
+
+
+def _inclusive_time(node: PlanNode) -> float:
+    loops = node.actual_loops if node.actual_loops is not None else 1
+    return (node.actual_time or 0.0) * loops
+
+
+def _is_cte_subplan(node: PlanNode) -> bool:
+    return str(node.get("Subplan Name", "")).startswith("CTE ")
+
+
+class Profile:
+    """
+    Profile of a :class:`~dataframe.DataFrame` attributing the actual cost to each step in its lineage.
+
+    It is obtained by calling :meth:`~dataframe.DataFrame.profile()`.
+
+    Each node in the plan is attributed to the step computing the CTE the
+    node belongs to. The time of a node counts only the time spent on
+    the node itself, excluding its inputs, so that the time of all steps adds
+    up to the time of the whole query.
+
+    Note:
+        The planner may merge several steps into one, e.g. by inlining a CTE
+        into its consumer. In that case, the resources of the merged steps are
+        attributed to the step consuming them.
+    """
+
+    def __init__(
+        self, plan: Plan, steps: List[ProfileStep], plan_names: Dict[str, ProfileStep]
+    ) -> None:
+        # noqa: D400
+        """:meta private:"""
+        self._plan = plan
+        self._steps = steps
+        cte_times = {
+            str(node["Subplan Name"])[len("CTE ") :]: _inclusive_time(node)
+            for node in plan.nodes()
+            if _is_cte_subplan(node)
+        }
+        consumed: Set[str] = set()
+
+        def visit(node: PlanNode, owner: ProfileStep) -> None:
+            if _is_cte_subplan(node):
+                owner = plan_names.get(str(node["Subplan Name"])[len("CTE ") :], owner)
+            elif node.node_type == "Subquery Scan" and node.get("Alias") in plan_names:
+                owner = plan_names[node["Alias"]]
+            if owner.rows is None and node.actual_rows is not None:
+                owner.rows = node.actual_rows * (node.actual_loops or 1)
+            # A CTE is computed when it is scanned for the first time, rather
+            # than by the node owning the CTE as an InitPlan.
+            inputs_time = sum(
+                [_inclusive_time(child) for child in node.children if not _is_cte_subplan(child)]
+            )
+            cte_name = node.get("CTE Name")
+            if cte_name in cte_times and cte_name not in consumed:
+                inputs_time += cte_times[cte_name]
+                consumed.add(cte_name)
+            owner.time = (owner.time or 0.0) + max(_inclusive_time(node) - inputs_time, 0.0)
+            for key in _MEMORY_PROPERTIES:
+                if key == "Sort Space Used" and node.get("Sort Space Type") == "Disk":
+                    continue
+                if isinstance(node.get(key), (int, float)):
+                    owner.memory = (owner.memory or 0.0) + node[key]
+            owner.nodes.append(node)
+            for child in node.children:
+                visit(child, owner)
+
+        visit(plan.root, steps[-1])
+
+    @property
+    def plan(self) -> Plan:
+        """Return the analyzed plan of the query."""
+        return self._plan
+
+    @property
+    def steps(self) -> List[ProfileStep]:
+        """Return the steps in the lineage, with inputs before the steps consuming them."""
+        return self._steps
+
+    @property
+    def total_time(self) -> Optional[float]:
+        """Return the time in milliseconds spent on executing the whole query."""
+        return self._plan.execution_time
+
+    def __repr__(self) -> str:
+        # noqa: D105
+        def fmt(val: Optional[float], precision: int) -> str:
+            return "" if val is None else f"{val:.{precision}f}"
+
+        header = ["step", "operation", "time (ms)", "rows", "memory (kB)", "call site"]
+        rows = [
+            [
+                str(i),
+                step.operation or "",
+                fmt(step.time, 3),
+                fmt(step.rows, 0),
+                fmt(step.memory, 0),
+                step.call_site or "",
+            ]
+            for i, step in enumerate(self._steps)
+        ]
+        widths = [max([len(row[col]) for row in [header] + rows]) for col in range(len(header))]
+        lines = [
+            " | ".join([cell.ljust(w) for cell, w in zip(row, widths)]).rstrip()
+            for row in [header] + rows
+        ]
+        lines.insert(1, "-+-".join(["-" * w for w in widths]))
+        lines.append(f"Execution Time: {fmt(self.total_time, 3)} ms")
+        return "\n".join(lines)
@@ -100,7 +100,10 @@ class DataType:
         """
         :meta private:
 
-        Create a new composite type in database and returns its name.
+        Create a new composite type in database.
+
+        The creation is deferred until the next query is executed in the
+        database, together with other pending functions and types.
 
         Args:
             db : :class:`~db.Database` : where the type will be created
@@ -109,7 +112,7 @@ class DataType:
             str: name of the created composite type
 
         """
-        if self._created_in_dbs is None or db in self._created_in_dbs:
+        if self._created_in_dbs is None or db in self._created_in_dbs or db._is_ddl_pending(self):
             return
         assert isinstance(
             self._annotation, type
@@ -121,11 +124,9 @@ class DataType:
         att_type_str = ",\n".join(
             [f"{name} {_serialize_to_type(type_t, db)}" for name, type_t in members.items()]
         )
-        db._execute(
-            f'CREATE TYPE "{schema}"."{self._name}" AS (\n' f"{att_type_str}\n" f");",
-            has_results=False,
+        db._defer_ddl(
+            self, f'CREATE TYPE "{schema}"."{self._name}" AS (\n' f"{att_type_str}\n" f");"
         )
-        self._created_in_dbs.add(db)
 
     def __call__(self, obj: Any) -> TypeCast:
         """
@@ -163,6 +164,155 @@ _defined_types: Dict[Optional[type], DataType] = {
 }
 
 
+class PackedArray(DataType):
+    """
+    Represents a numeric array packed into :code:`bytea` for passing to and from a UDF.
+
+    It is created by :func:`~type.packed_array`.
+    """
+
+    def __init__(self, element_type: type) -> None:
+        # noqa: D107
+        assert element_type in _packed_element_types, f"Cannot pack array of {element_type}."
+        super().__init__(name="bytea")
+        self._element_type = element_type
+        self._dtype, self._type_oid, self._element_type_name = _packed_element_types[element_type]
+
+
+# -- Map from Python type of array elements to their NumPy dtype in the binary
+# format of PostgreSQL, which is big-endian, and the OID and name of their type.
+_packed_element_types: Dict[type, Tuple[str, int, str]] = {
+    bool: ("?", 16, "bool"),
+    int: (">i4", 23, "int4"),
+    float: (">f8", 701, "float8"),
+}
+
+
+def packed_array(element_type: type = float) -> PackedArray:
+    """
+    Get the annotation of a numeric array passed to or returned from a UDF in a packed form.
+
+    Rather than being converted to a Python :code:`list` element by element,
+    the array is passed as a :code:`bytea` in the binary format of PostgreSQL
+    arrays and is turned into a :code:`numpy.ndarray` without copying inside
+    the UDF. Similarly, a :code:`numpy.ndarray` returned is packed into
+    :code:`bytea` as a whole.
+
+    When calling the UDF, the argument can be a numeric array, or a
+    packed array returned by another UDF. A :code:`bytea` column
+    containing packed arrays needs to be cast to :code:`bytea` explicitly
+    with :code:`gp.type_("bytea")`, so that it is not packed again.
+
+    Args:
+        element_type: Python type of the elements, which is :code:`bool`,
+            :code:`int` or :code:`float`.
+
+    Returns:
+        The annotation to be used for parameters and return values of the UDF.
+
+    Note:
+        NumPy needs to be installed on the host of the database server, and on
+        the client if Python objects are passed as arguments. Arrays to be
+        packed cannot contain :code:`NULL`.
+
+    Example:
+        .. highlight:: python
+        .. code-block::  Python
+
+            >>> @gp.create_function
+            ... def norm(vec: gp.packed_array(float)) -> float:
+            ...     import numpy
+            ...     return float(numpy.linalg.norm(vec))
+
+            >>> df = db.create_dataframe(rows=[([3.0, 4.0],)], column_names=["vec"])
+            >>> df.assign(norm=lambda t: norm(t["vec"]))[["norm"]]
+            ------
+             norm
+            ------
+                5
+            ------
+            (1 row)
+    """
+    return PackedArray(element_type)
+
+
+def _pack_array(values: Any, dtype: str, type_oid: int) -> bytes:
+    # noqa: D400
+    """
+    :meta private:
+
+    Pack the values into the binary format of a one-dimensional PostgreSQL array.
+
+    The function is also sent to and called in the UDFs, so it needs to be
+    self-contained.
+    """
+    import struct
+
+    import numpy
+
+    values = numpy.ravel(values)
+    if len(values) == 0:
+        return struct.pack(">iiI", 0, 0, type_oid)
+    elements = numpy.empty(len(values), dtype=[("len", ">i4"), ("val", dtype)])
+    elements["len"] = numpy.dtype(dtype).itemsize
+    elements["val"] = values
+    return struct.pack(">iiIii", 1, 0, type_oid, len(values), 1) + elements.tobytes()
+
+
+def _unpack_array(data: bytes, dtype: str) -> Any:
+    # noqa: D400
+    """
+    :meta private:
+
+    Unpack the binary format of a PostgreSQL array into a flat NumPy array
+    without copying.
+
+    The function is sent to and called in the UDFs, so it needs to be
+    self-contained.
+    """
+    import numpy
+
+    ndim, has_null = numpy.frombuffer(data, dtype=">i4", count=2)
+    if has_null:
+        raise ValueError("Packed array cannot contain NULL.")
+    # Each element is prefixed by its length after the header and dimensions.
+    elements = numpy.frombuffer(data, dtype=[("len", ">i4"), ("val", dtype)], offset=12 + 8 * ndim)
+    return elements["val"]
+
+
+def _unpack_columns(data: bytes, dtypes: List[str]) -> List[Any]:
+    # noqa: D400
+    """
+    :meta private:
+
+    Unpack the columns packed by :class:`~func.ColumnFunction` into NumPy arrays.
+
+    The data starts with the number of rows, followed by one validity byte
+    for each column of each row, and then the values of each column stored
+    contiguously. A column containing :code:`NULL` is unpacked into a
+    :code:`numpy.ma.MaskedArray`, otherwise into a :code:`numpy.ndarray`
+    without copying.
+
+    The function is sent to and called in the UDFs, so it needs to be
+    self-contained.
+    """
+    import numpy
+
+    num_rows = int(numpy.frombuffer(data, dtype=">i4", count=1)[0])
+    validity = numpy.frombuffer(data, dtype="u1", count=num_rows * len(dtypes), offset=4)
+    validity = validity.reshape(num_rows, len(dtypes))
+    offset = 4 + validity.nbytes
+    columns: List[Any] = []
+    for i, dtype in enumerate(dtypes):
+        values = numpy.frombuffer(data, dtype=dtype, count=num_rows, offset=offset)
+        offset += values.nbytes
+        is_valid = validity[:, i]
+        columns.append(
+            values if is_valid.all() else numpy.ma.masked_array(values, mask=(is_valid == 0))
+        )
+    return columns
+
+
 def type_(name: str, schema: Optional[str] = None, modifier: Optional[int] = None) -> DataType:
     """
     Get access to a type predefined in database.
@@ -482,15 +482,35 @@ def test_table_describe(db: gp.Database):
     result = df.describe()
     assert len(result) == 2
     df_s = df[["a", "b"]]
-    with pytest.raises(Exception) as exc_info:
-        df_s.describe()
-    assert "Dataframe is not saved in database" in str(exc_info.value)
+    assert df_s.describe() == result
     df_not_exist = db.create_dataframe(table_name="not_exist_table")
     with pytest.raises(Exception) as exc_info:
         df_not_exist.describe()
     assert 'relation "not_exist_table" does not exist' in str(exc_info.value)
 
 
+def test_dataframe_infer_schema(db: gp.Database):
+    t = db.create_dataframe(rows=[(1, "a", 1.5)], column_names=["id", "name", "score"])
+    df = t[lambda t: t["id"] > 0][["score", "id"]]
+    assert df.describe() == {"score": "numeric", "id": "integer"}
+    # The schema is derived from the cached schema of the parent without querying.
+    t.describe()
+    assert t[["name"]]._known_schema() == {"name": "text"}
+    assert t.assign(double=lambda t: t["id"] * 2).describe() == {
+        "id": "integer",
+        "name": "text",
+        "score": "numeric",
+        "double": "integer",
+    }
+
+
+def test_dataframe_save_as_without_column_names(db: gp.Database):
+    t = db.create_dataframe(rows=[(1, "a")], column_names=["id", "name"])
+    df = t.save_as(temp=True)
+    assert df.describe() == {"id": "integer", "name": "text"}
+    assert len(list(df)) == 1
+
+
 import pandas as pd
 
 
@@ -522,3 +542,60 @@ def test_const_non_ascii(db: gp.Database):
     df = db.create_dataframe(columns={"Ø": ["Ø"]})
     for row in df[["Ø"]]:
         assert row["Ø"] == "Ø"
+
+
+def test_dataframe_bind_parameters(db: gp.Database):
+    rows = [(i, f"name_{i}") for i in range(10)]
+    df = db.create_dataframe(rows=rows, column_names=["id", "name"])
+    lookup = df[lambda t: t["id"] == gp.parameter("id")][["name"]]
+    for i in range(3):
+        assert [row["name"] for row in lookup.bind(id=i)] == [f"name_{i}"]
+    num_prepared = len(db._prepared_statements)
+
+    # DataFrames of the same shape share the same prepared statement.
+    rebuilt = df[lambda t: t["id"] == gp.parameter("id")][["name"]]
+    assert [row["name"] for row in rebuilt.bind(id=5)] == ["name_5"]
+    assert len(db._prepared_statements) == num_prepared
+
+    with pytest.raises(Exception) as exc_info:
+        list(lookup)
+    assert "not bound" in str(exc_info.value)
+
+
+def test_dataframe_bind_conflict(db: gp.Database):
+    df = db.create_dataframe(columns={"id": range(10)})
+    lookup = df[lambda t: t["id"] == gp.parameter("id")]
+    joined = lookup.bind(id=1).join(lookup.bind(id=2), on="id", other_columns={})
+    with pytest.raises(Exception) as exc_info:
+        list(joined)
+    assert "Conflicting values" in str(exc_info.value)
+    assert len(list(lookup.bind(id=1).join(lookup.bind(id=1), on="id", other_columns={}))) == 1
+
+
+def test_dataframe_local_settings(db: gp.Database):
+    default = next(iter(db._execute("SHOW work_mem")))["work_mem"]
+    df = gp.DataFrame("SELECT current_setting('work_mem') AS work_mem", db=db)
+    df._settings = {"work_mem": "8MB"}
+    # Settings apply to the dataframes derived from it as well.
+    assert next(iter(df[["work_mem"]]))["work_mem"] == "8MB"
+    assert next(iter(db._execute("SHOW work_mem")))["work_mem"] == default
+    # The value set in the session before is kept as well.
+    db._execute("SET work_mem TO '3MB'", has_results=False)
+    try:
+        assert next(iter(df))["work_mem"] == "8MB"
+        assert next(iter(db._execute("SHOW work_mem")))["work_mem"] == "3MB"
+    finally:
+        db._execute("RESET work_mem", has_results=False)
+
+
+def test_dataframe_prepared_statement_eviction(db: gp.Database):
+    cache_size = gp.config.prepared_statement_cache_size
+    gp.config.prepared_statement_cache_size = 2
+    try:
+        df = db.create_dataframe(columns={"id": range(10)})
+        for op in ["<", ">", "="]:
+            result = df[lambda t: gp.operator(op)(t["id"], gp.parameter("bound"))]
+            assert len(list(result.bind(bound=5))) == {"<": 5, ">": 4, "=": 1}[op]
+        assert len(db._prepared_statements) <= 2
+    finally:
+        gp.config.prepared_statement_cache_size = cache_size
@@ -3,6 +3,7 @@ from os import environ
 import pytest
 
 import greenplumpython as gp
+from greenplumpython.monitor import QueryEvent, QueryListener
 from tests import db
 
 
@@ -42,3 +43,74 @@ def test_db_assign_zero_columns(db: gp.Database):
     print(df)
     expected = "----\n" "    \n" "----\n" "    \n" "----\n" "(1 row)\n"
     assert str(df) == expected
+
+
+def test_db_catalog_cache(db: gp.Database):
+    db._execute("CREATE TEMP TABLE test_catalog_cache (a int)", has_results=False)
+    t = db.create_dataframe(table_name="test_catalog_cache")
+    assert t.describe() == {"a": "integer"}
+
+    class Counter(QueryListener):
+        count = 0
+
+        def on_query_start(self, event: QueryEvent) -> None:
+            self.count += 1
+
+    counter = Counter()
+    db.add_listener(counter)
+    try:
+        db._execute("ALTER TABLE test_catalog_cache ADD COLUMN b text", has_results=False)
+        # Schema is shared by dataframes of the same table without querying.
+        assert db.create_dataframe(table_name="test_catalog_cache").describe() == {"a": "integer"}
+        assert counter.count == 1
+        db.invalidate_cache("test_catalog_cache")
+        assert t.describe() == {"a": "integer", "b": "text"}
+    finally:
+        db.remove_listener(counter)
+
+
+def test_db_catalog_cache_qualified_name(db: gp.Database):
+    db._execute("CREATE TEMP TABLE test_catalog_cache_qualified (a int)", has_results=False)
+    assert db.create_dataframe(table_name="test_catalog_cache_qualified").describe() == {
+        "a": "integer"
+    }
+    db._execute("ALTER TABLE test_catalog_cache_qualified ADD COLUMN b text", has_results=False)
+    # The cache is keyed by the relation, whatever name it is invalidated with.
+    db.invalidate_cache("test_catalog_cache_qualified", schema="pg_temp")
+    assert db.create_dataframe(table_name="test_catalog_cache_qualified").describe() == {
+        "a": "integer",
+        "b": "text",
+    }
+
+
+def test_db_warm_up(db: gp.Database):
+    @gp.create_function
+    def add_one(val: int) -> int:
+        return val + 1
+
+    times = db.warm_up(add_one(0))
+    assert -1 in times and all([t >= 0 for t in times.values()])
+    assert next(iter(db.assign(result=lambda: add_one(1))))["result"] == 2
+
+
+def test_db_catalog_cache_invalidate_without_query(db: gp.Database):
+    db._execute("CREATE TEMP TABLE test_catalog_cache_invalidate (a int)", has_results=False)
+    t = db.create_dataframe(table_name="test_catalog_cache_invalidate")
+    assert t.describe() == {"a": "integer"}
+
+    class Counter(QueryListener):
+        count = 0
+
+        def on_query_start(self, event: QueryEvent) -> None:
+            self.count += 1
+
+    counter = Counter()
+    db.add_listener(counter)
+    try:
+        # The relation is found by the oid cached for its name.
+        assert t._qualified_table_name is not None
+        db._invalidate_cache(t._qualified_table_name)
+        assert counter.count == 0
+    finally:
+        db.remove_listener(counter)
+    assert db._get_cached(("schema", t._qualified_table_name)) is None
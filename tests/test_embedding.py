@@ -1,3 +1,5 @@
+from typing import Any, Dict, Optional, Set
+
 import pytest
 
 import greenplumpython as gp
@@ -5,6 +7,27 @@ import greenplumpython.experimental.embedding as _
 from tests import db
 
 
+def save_docs(
+    db: gp.Database,
+    columns: Dict[str, Any],
+    table_name: Optional[str] = None,
+    unique_key: Set[str] = {"id"},
+) -> gp.DataFrame:
+    return (
+        db.create_dataframe(columns=columns)
+        .save_as(
+            table_name=table_name,
+            temp=True,
+            column_names=list(columns.keys()),
+            distribution_key={"id"},
+            distribution_type="hash",
+            drop_if_exists=True,
+            drop_cascade=True,
+        )
+        .check_unique(columns=unique_key)
+    )
+
+
 def search_embeddings(t: gp.DataFrame):
     results = t.embedding().search(column="content", query="apple", top_k=1)
     assert len(list(results)) == 1
@@ -15,19 +38,7 @@ def search_embeddings(t: gp.DataFrame):
 @pytest.mark.requires_pgvector
 def test_embedding_query_text(db: gp.Database):
     content = ["I have a dog.", "I like eating apples."]
-    t = (
-        db.create_dataframe(columns={"id": range(len(content)), "content": content})
-        .save_as(
-            table_name="doc",
-            temp=True,
-            column_names=["id", "content"],
-            distribution_key={"id"},
-            distribution_type="hash",
-            drop_if_exists=True,
-            drop_cascade=True,
-        )
-        .check_unique(columns={"id"})
-    )
+    t = save_docs(db, {"id": range(len(content)), "content": content}, table_name="doc")
     t = t.embedding().create_index(column="content", model_name="all-MiniLM-L6-v2")
     search_embeddings(t)
 
@@ -40,18 +51,7 @@ def test_embedding_query_text(db: gp.Database):
 def test_embedding_multi_col_unique(db: gp.Database):
     content = ["I have a dog.", "I like eating apples."]
     columns = {"id": range(len(content)), "id2": [1] * len(content), "content": content}
-    t = (
-        db.create_dataframe(columns=columns)
-        .save_as(
-            temp=True,
-            column_names=list(columns.keys()),
-            distribution_key={"id"},
-            distribution_type="hash",
-            drop_if_exists=True,
-            drop_cascade=True,
-        )
-        .check_unique(columns={"id", "id2"})
-    )
+    t = save_docs(db, columns, unique_key={"id", "id2"})
     t = t.embedding().create_index(column="content", model_name="all-MiniLM-L6-v2")
     print(
         "reloptions =",
@@ -60,3 +60,146 @@ def test_embedding_multi_col_unique(db: gp.Database):
         ),
     )
     search_embeddings(t)
+
+
+@pytest.mark.requires_pgvector
+def test_embedding_multi_model(db: gp.Database):
+    from greenplumpython.experimental.embedding import create_embedding
+
+    distance = gp.operator("<->")
+    results = db.assign(
+        distance=lambda: distance(
+            create_embedding("I like eating apples.", "all-MiniLM-L6-v2"),
+            create_embedding("I like eating apples.", "paraphrase-MiniLM-L3-v2"),
+        )
+    )
+    assert next(iter(results))["distance"] > 0
+
+
+@pytest.mark.requires_pgvector
+def test_embedding_batched(db: gp.Database):
+    content = ["I have a dog.", "I like eating apples.", "The sky is blue."]
+    t = save_docs(db, {"id": range(len(content)), "content": content})
+    t = t.embedding().create_index(column="content", model_name="all-MiniLM-L6-v2", batch_size=2)
+    search_embeddings(t)
+
+
+@pytest.mark.requires_pgvector
+def test_embedding_search_index_scan(db: gp.Database):
+    content = ["I have a dog.", "I like eating apples."]
+    t = save_docs(db, {"id": range(len(content)), "content": content})
+    t = t.embedding().create_index(column="content", model_name="all-MiniLM-L6-v2")
+    results = t.embedding().search(column="content", query="apple", top_k=1)
+    db._execute("SET enable_seqscan TO off", has_results=False)
+    try:
+        plan = [row["QUERY PLAN"] for row in db._execute(f"EXPLAIN {results._serialize()}")]
+        assert any(["Index Scan" in line for line in plan])
+    finally:
+        db._execute("RESET enable_seqscan", has_results=False)
+    search_embeddings(t)
+
+
+@pytest.mark.requires_pgvector
+def test_embedding_update_index(db: gp.Database):
+    content = ["I have a dog.", "I like eating bananas.", "The sky is blue."]
+    t = save_docs(db, {"id": range(len(content)), "content": content}, table_name="doc")
+    t = t.embedding().create_index(column="content", model_name="all-MiniLM-L6-v2")
+    db._execute(
+        f"""
+        UPDATE {t._qualified_table_name} SET content = 'I like eating apples.' WHERE id = 1;
+        DELETE FROM {t._qualified_table_name} WHERE id = 2;
+        INSERT INTO {t._qualified_table_name} VALUES (3, 'It is raining.');
+        """,
+        has_results=False,
+    )
+    t = t.embedding().update_index(column="content")
+    search_embeddings(t)
+    results = t.embedding().search(column="content", query="rain", top_k=3)
+    assert sorted([row["id"] for row in results]) == [0, 1, 3]
+
+
+@pytest.mark.requires_pgvector
+def test_embedding_search_batch(db: gp.Database):
+    content = ["I have a dog.", "I like eating apples.", "The sky is blue."]
+    t = save_docs(db, {"id": range(len(content)), "content": content})
+    t = t.embedding().create_index(column="content", model_name="all-MiniLM-L6-v2")
+    results = t.embedding().search_batch(column="content", queries=["apple", "puppy"], top_k=1)
+    assert {row["query_id"]: row["content"] for row in results} == {
+        0: "I like eating apples.",
+        1: "I have a dog.",
+    }
+
+    queries = db.create_dataframe(columns={"qid": [10, 20], "text": ["sky", "fruit"]})
+    results = t.embedding().search_batch(
+        column="content", queries=queries, top_k=2, query_column="text", query_id_column="qid"
+    )
+    rows = list(results)
+    assert sorted([row["qid"] for row in rows]) == [10, 10, 20, 20]
+    assert all([row["distance"] >= 0 for row in rows])
+
+
+@pytest.mark.requires_pgvector
+@pytest.mark.parametrize(
+    "metric, method, params",
+    [
+        ("cosine", "hnsw", {"m": 8, "ef_construction": 32}),
+        ("inner_product", "ivfflat", {"lists": 1}),
+    ],
+)
+def test_embedding_index_params(db: gp.Database, metric: str, method: str, params: dict):
+    content = ["I have a dog.", "I like eating apples."]
+    t = save_docs(db, {"id": range(len(content)), "content": content})
+    t = t.embedding().create_index(
+        column="content", model_name="all-MiniLM-L6-v2", method=method, metric=metric, **params
+    )
+    results = t.embedding().search(column="content", query="apple", top_k=1, ef_search=20, probes=1)
+    assert len(list(results)) == 1
+    assert next(iter(results))["content"] == "I like eating apples."
+
+
+@pytest.mark.requires_pgvector
+@pytest.mark.parametrize("quantization", ["half", "binary"])
+def test_embedding_quantization(db: gp.Database, quantization: str):
+    content = ["I have a dog.", "I like eating apples.", "The sky is blue."]
+    t = save_docs(db, {"id": range(len(content)), "content": content})
+    t = t.embedding().create_index(
+        column="content",
+        model_name="all-MiniLM-L6-v2",
+        quantization=quantization,
+        full_precision=True,
+    )
+    results = t.embedding().search(column="content", query="apple", top_k=1, rerank_candidates=3)
+    assert [row["content"] for row in results] == ["I like eating apples."]
+    results = t.embedding().search_batch(
+        column="content", queries=["apple", "puppy"], top_k=1, rerank_candidates=3
+    )
+    assert {row["query_id"]: row["content"] for row in results} == {
+        0: "I like eating apples.",
+        1: "I have a dog.",
+    }
+    if quantization == "half":
+        search_embeddings(t)
+
+
+@pytest.mark.requires_pgvector
+@pytest.mark.parametrize("strategy", ["auto", "pre_filter", "post_filter"])
+def test_embedding_search_where(db: gp.Database, strategy: str):
+    content = ["I like eating apples.", "I like eating bananas.", "I have a dog."] * 10
+    columns = {
+        "id": range(len(content)),
+        "tenant": [i % 10 for i in range(len(content))],
+        "content": content,
+    }
+    t = save_docs(db, columns)
+    t = t.embedding().create_index(column="content", model_name="all-MiniLM-L6-v2")
+    results = t.embedding().search(
+        column="content",
+        query="apple",
+        top_k=3,
+        where=lambda t: t["tenant"] == 1,
+        strategy=strategy,
+    )
+    rows = list(results)
+    assert len(rows) == 3
+    assert all([row["tenant"] == 1 for row in rows])
+    assert "I like eating apples." in [row["content"] for row in rows]
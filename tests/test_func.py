@@ -1,11 +1,12 @@
 import sys
-from typing import Callable, List
+from typing import Callable, List, Set
 
 import pytest
 
 import greenplumpython as gp
 from greenplumpython.builtins.functions import count, generate_series
 from greenplumpython.func import AggregateFunction, NormalFunction
+from greenplumpython.monitor import QueryEvent, QueryListener
 from tests import db
 
 
@@ -270,6 +271,24 @@ def test_create_agg_with_optional_param(db: gp.Database):
     assert isinstance(agg_opt_param, AggregateFunction)
 
 
+def test_create_agg_combine_final(db: gp.Database):
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    def describe(state: int) -> str:
+        return f"total: {state}"
+
+    @gp.create_aggregate(combine_func=add, final_func=describe, initial_condition="0")
+    def sum_squares(state: int, val: int) -> int:
+        return state + val * val
+
+    rows = [(i, i % 2 == 0) for i in range(10)]
+    numbers = db.create_dataframe(rows=rows, column_names=["val", "is_even"])
+    results = numbers.group_by("is_even").assign(result=lambda t: sum_squares(t["val"]))
+    for row in results:
+        assert row["result"] == ("total: 120" if row["is_even"] else "total: 165")
+
+
 @gp.create_column_function
 def my_sum_array(val_list: List[int]) -> int:
     return sum(val_list)
@@ -833,3 +852,225 @@ def test_func_in_where(db: gp.Database):
     df = db.create_dataframe(columns={"a": [1]})
     result = df.where(lambda t: add_two(t["a"]) < 5)
     assert len(list(result)) == 1
+
+
+def test_func_ddl_batched(db: gp.Database):
+    class Pair:
+        first: int
+        second: int
+
+    @gp.create_function
+    def make_pair(x: int) -> Pair:
+        return {"first": x, "second": x}
+
+    @gp.create_function
+    def negate(x: int) -> int:
+        return -x
+
+    class Recorder(QueryListener):
+        def __init__(self) -> None:
+            self.sqls: List[str] = []
+
+        def on_query_start(self, event: QueryEvent) -> None:
+            self.sqls.append(event.sql)
+
+    recorder = Recorder()
+    db.add_listener(recorder)
+    try:
+        df = db.create_dataframe(columns={"a": [1]})
+        result = df.assign(pair=lambda t: make_pair(t["a"]), neg=lambda t: negate(t["a"]))
+        assert len(recorder.sqls) == 0
+        assert [row["neg"] for row in result] == [-1]
+        assert len(recorder.sqls) == 2
+        assert "CREATE TYPE" in recorder.sqls[0] and "CREATE FUNCTION" in recorder.sqls[0]
+    finally:
+        db.remove_listener(recorder)
+
+
+def test_func_persistent(db: gp.Database):
+    def triple(x: int) -> int:
+        return x * 3
+
+    first = gp.create_function(triple, schema="test")
+    second = gp.create_function(schema="test")(triple)
+    # The function is named by its content when it is defined.
+    name = first._qualified_name_str
+    for func in [first, second]:
+        assert [row["val"] for row in db.assign(val=lambda: func(2))] == [6]
+    assert first._qualified_name_str == second._qualified_name_str == name
+    assert first._qualified_name_str.startswith('"test"."func_')
+    result = db._execute(
+        f"SELECT count(*) AS n FROM pg_proc WHERE proname = '{first._qualified_name[1]}'"
+    )
+    assert next(iter(result))["n"] == 1
+
+
+def test_vectorized_func(db: gp.Database):
+    @gp.create_vectorized_function(batch_size=3)
+    def add_batch(a: int, b: int) -> int:
+        assert len(a) <= 3
+        return a + b
+
+    df = db.create_dataframe(
+        rows=[(i, -i, str(i)) for i in range(10)], column_names=["a", "b", "c"]
+    )
+    result = df.apply(lambda t: add_batch(t["a"], t["b"]), column_name="sum")
+    rows = list(result)
+    assert len(rows) == 10
+    for row in rows:
+        assert row["sum"] == 0 and row["c"] == str(row["a"])
+
+
+def test_vectorized_func_in_assign(db: gp.Database):
+    @gp.create_vectorized_function
+    def double(a: float) -> float:
+        return a * 2
+
+    df = db.create_dataframe(columns={"a": [1.0]})
+    with pytest.raises(Exception) as exc_info:
+        list(df.assign(b=lambda t: double(t["a"])))
+    assert "Vectorized function can only be called by DataFrame.apply()" in str(exc_info.value)
+
+
+def test_func_packed_array(db: gp.Database):
+    @gp.create_function
+    def scale(vec: gp.packed_array(float), factor: float) -> gp.packed_array(float):
+        return vec * factor
+
+    @gp.create_function
+    def total(vec: gp.packed_array(float)) -> float:
+        return float(vec.sum())
+
+    @gp.create_function
+    def count_odd(vec: gp.packed_array(int)) -> int:
+        return int((vec % 2).sum())
+
+    df = db.create_dataframe(rows=[([1.0, 2.0], [1, 2, 3])], column_names=["floats", "ints"])
+    result = df.assign(
+        total=lambda t: total(scale(t["floats"], 10.0)),
+        const_total=lambda _: total([0.5, 0.25]),
+        odd=lambda t: count_odd(t["ints"]),
+    )
+    for row in result:
+        assert row["total"] == 30.0
+        assert row["const_total"] == 0.75
+        assert row["odd"] == 2
+
+
+def test_array_func_packed(db: gp.Database):
+    @gp.create_column_function(packed=True)
+    def weighted_sum(vals: List[float], weights: List[int], scale: int) -> float:
+        return float((vals * weights).sum()) * scale
+
+    rows = [(float(i), 1 if i != 9 else None, i % 2 == 0) for i in range(10)]
+    numbers = db.create_dataframe(rows=rows, column_names=["val", "weight", "is_even"])
+    results = numbers.group_by("is_even").assign(
+        result=lambda t: weighted_sum(t["val"], t["weight"], 2)
+    )
+    for row in results:
+        assert row["result"] == (40.0 if row["is_even"] else 32.0)
+
+
+def test_array_func_chunked(db: gp.Database):
+    def add_up(partial_sums: List[int]) -> int:
+        return sum(partial_sums)
+
+    @gp.create_column_function(chunk_size=2, reduce_func=add_up)
+    def my_sum(val_list: List[int]) -> int:
+        return sum(val_list)
+
+    def largest(chunk_sizes: List[int]) -> int:
+        return max(chunk_sizes)
+
+    @gp.create_column_function(chunk_size=2, reduce_func=largest)
+    def chunk_size(val_list: List[int]) -> int:
+        return len(val_list)
+
+    rows = [(i, i % 2 == 0) for i in range(10)]
+    numbers = db.create_dataframe(rows=rows, column_names=["val", "is_even"])
+    results = numbers.group_by("is_even").apply(lambda t: my_sum(t["val"]), column_name="sum")
+    for row in results:
+        assert row["sum"] == (20 if row["is_even"] else 25)
+    results = numbers.apply(lambda t: chunk_size(t["val"]), column_name="size")
+    assert list(results)[0]["size"] <= 2
+
+
+def test_func_options(db: gp.Database):
+    @gp.create_function(volatility="immutable", parallel="safe", strict=True, cost=1)
+    def add_one(val: int) -> int:
+        return val + 1
+
+    numbers = db.create_dataframe(rows=[(1,), (None,)], column_names=["val"])
+    results = numbers.assign(result=lambda t: add_one(t["val"]))
+    assert sorted([row["result"] for row in results], key=lambda v: v is None) == [2, None]
+    info = next(
+        iter(
+            db._execute(
+                f"""
+                SELECT provolatile, proisstrict, procost FROM pg_proc
+                WHERE oid = to_regproc('{add_one._qualified_name_str}')
+                """
+            )
+        )
+    )
+    assert info["provolatile"] == "i" and info["proisstrict"] and info["procost"] == 1
+
+
+def test_func_captured_objects(db: gp.Database):
+    weights = list(range(100000))
+
+    @gp.create_function
+    def weight_of(i: int) -> int:
+        return weights[i]
+
+    @gp.create_function
+    def total_weight() -> int:
+        return sum(weights)
+
+    def count_objects() -> int:
+        query = """
+            SELECT count(*) FROM pg_proc
+            WHERE proname LIKE '\\_\\_gp\\_object\\_%' AND pronamespace = pg_my_temp_schema()
+        """
+        return next(iter(db._execute(query)))["count"]
+
+    objects_before = count_objects()
+    results = db.assign(weight=lambda: weight_of(42), total=lambda: total_weight())
+    row = next(iter(results))
+    assert row["weight"] == 42 and row["total"] == sum(weights)
+    assert count_objects() == objects_before + 1
+
+
+def test_func_ddl_batch_failure(db: gp.Database):
+    class Created:
+        def __init__(self) -> None:
+            self._created_in_dbs: Set[gp.Database] = set()
+
+    good, bad, later = Created(), Created(), Created()
+    db._defer_ddl(good, "CREATE TEMP TABLE test_ddl_good (a int);")
+    db._defer_ddl(bad, "CREATE TEMP TABLE test_ddl_bad (a no_such_type);")
+    db._defer_ddl(later, "CREATE TEMP TABLE test_ddl_later (a int);")
+    with pytest.raises(Exception) as exc_info:
+        db._flush_ddl()
+    assert "no_such_type" in str(exc_info.value)
+    assert db in good._created_in_dbs and db not in bad._created_in_dbs
+    assert db._is_ddl_pending(later) and not db._is_ddl_pending(bad)
+    db._execute("SELECT 1")
+    assert db in later._created_in_dbs
+
+
+def _offset() -> int:
+    return 100
+
+
+def test_func_helpers(db: gp.Database):
+    @gp.create_function(helpers=[_offset])
+    def add_offset(x: int) -> int:
+        import sys
+
+        gd = globals().get("GD")
+        if gd is None:
+            gd = sys.modules["plpy"]._GD
+        return x + gd["__gp_offset"]()
+
+    assert [row["val"] for row in db.assign(val=lambda: add_offset(1))] == [101]
@@ -65,6 +65,16 @@ def test_index_opclass(db: gp.Database):
     assert _using_index_scan(df[lambda t: t["text"] > "hello"], db)
 
 
+def test_index_storage_params(db: gp.Database):
+    db.create_dataframe(columns={"id": [1, 2]}).save_as(
+        temp=True, column_names=["id"]
+    ).create_index({"id"}, name="idx_fillfactor", storage_params={"fillfactor": 70})
+    result = db._execute(
+        "SELECT reloptions FROM pg_class WHERE oid = 'pg_temp.idx_fillfactor'::regclass"
+    )
+    assert next(iter(result))["reloptions"] == ["fillfactor=70"]
+
+
 def test_op_with_schema(db: gp.Database):
     my_add = gp.operator("+")
     result = db.assign(add=lambda: my_add(1, 2))
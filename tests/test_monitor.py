@@ -0,0 +1,117 @@
+from typing import List
+
+import pytest
+
+import greenplumpython as gp
+from greenplumpython.monitor import (
+    QueryEvent,
+    QueryHistory,
+    QueryListener,
+    QueryStatistics,
+)
+from tests import db
+
+
+class EventRecorder(QueryListener):
+    def __init__(self) -> None:
+        self.started: List[QueryEvent] = []
+        self.ended: List[QueryEvent] = []
+
+    def on_query_start(self, event: QueryEvent) -> None:
+        assert event.duration is None
+        self.started.append(event)
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        self.ended.append(event)
+
+
+def test_listener_events(db: gp.Database):
+    recorder = EventRecorder()
+    db.add_listener(recorder)
+    try:
+        df = db.create_dataframe(columns={"id": range(10)})
+        assert len(list(df)) == 10
+    finally:
+        db.remove_listener(recorder)
+    assert len(recorder.started) == len(recorder.ended) == 1
+    event = recorder.ended[0]
+    assert event.dataframe is df
+    assert event.duration is not None and event.duration >= 0
+    assert event.rowcount == 10
+    assert event.bytes_sent == len(event.sql.encode())
+    assert event.bytes_received is not None and event.bytes_received > 0
+    assert event.error is None
+
+    list(db.create_dataframe(columns={"id": range(10)}))
+    assert len(recorder.ended) == 1
+
+
+def test_listener_error(db: gp.Database):
+    recorder = EventRecorder()
+    db.add_listener(recorder)
+    try:
+        with pytest.raises(Exception):
+            db._execute("SELECT * FROM table_not_exists")
+    finally:
+        db.remove_listener(recorder)
+    assert len(recorder.ended) == 1
+    assert recorder.ended[0].error is not None
+
+
+def test_query_statistics_by_shape(db: gp.Database):
+    stats = QueryStatistics()
+    db.add_listener(stats)
+    try:
+        df = db.create_dataframe(columns={"id": range(10)})
+        for i in range(5):
+            list(df[lambda t: t["id"] >= i])
+        list(df[lambda t: t["id"].in_([1, 2])])
+    finally:
+        db.remove_listener(stats)
+    shapes = sorted(stats.shapes, key=lambda shape: shape.calls)
+    assert [shape.calls for shape in shapes] == [1, 5]
+    assert shapes[1].rows == 10 + 9 + 8 + 7 + 6
+    assert shapes[1].min_time <= shapes[1].mean_time <= shapes[1].max_time
+    stats.reset()
+    assert len(stats.shapes) == 0
+
+
+def _record(history: QueryHistory, sql: str, duration: float) -> None:
+    event = QueryEvent(sql)
+    event._end(rowcount=1)
+    event.duration = duration
+    history.on_query_end(event)
+
+
+def test_query_history_regression(tmp_path):
+    path = str(tmp_path / "history.db")
+    history = QueryHistory(path)
+    for i in range(5):
+        _record(history, f"SELECT * FROM t WHERE id = {i}", 0.1)
+        _record(history, f"SELECT * FROM s WHERE id = {i}", 0.1)
+    history.close()
+
+    # The history persists across sessions.
+    history = QueryHistory(path)
+    for i in range(3):
+        _record(history, f"SELECT * FROM t WHERE id = {i}", 0.3)
+        _record(history, f"SELECT * FROM s WHERE id = {i}", 0.1)
+    regressions = history.compare(recent=3, threshold=2)
+    assert len(regressions) == 1
+    assert regressions[0].sql == "SELECT * FROM t WHERE id = ?"
+    assert regressions[0].baseline_calls == 5 and regressions[0].recent_calls == 3
+    assert regressions[0].ratio == pytest.approx(3)
+    history.close()
+
+
+def test_query_history_labels(tmp_path):
+    path = str(tmp_path / "history.db")
+    for label, duration in [("v1", 0.1), ("v2", 0.2)]:
+        history = QueryHistory(path, label=label)
+        for i in range(3):
+            _record(history, f"SELECT {i}", duration)
+        history.close()
+    history = QueryHistory(path)
+    assert len(history.compare(baseline_label="v1", recent_label="v2", threshold=1.5)) == 1
+    assert len(history.compare(baseline_label="v2", recent_label="v1", threshold=1.5)) == 0
+    history.close()
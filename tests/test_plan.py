@@ -0,0 +1,62 @@
+import greenplumpython as gp
+from tests import db
+
+
+def test_explain_plan_tree(db: gp.Database):
+    df = db.create_dataframe(columns={"id": range(10)})
+    plan = df[lambda t: t["id"] > 5].explain()
+    assert plan.root.estimated_rows > 0
+    assert plan.root.actual_rows is None
+    assert plan.execution_time is None
+    assert all(node.node_type for node in plan.nodes())
+    if db._is_variant("greenplum"):
+        assert len(plan.slices) > 0
+
+
+def test_explain_analyze(db: gp.Database):
+    rows = [(i,) for i in range(10)]
+    df = db.create_dataframe(rows=rows, column_names=["id"])
+    plan = df[lambda t: t["id"] > 5].explain(analyze=True)
+    assert plan.root.actual_rows == 4
+    assert plan.execution_time is not None
+    assert plan.root.node_type in repr(plan)
+
+
+def test_explain_text(db: gp.Database):
+    df = db.create_dataframe(columns={"id": range(10)})
+    assert "cost=" in df.explain(format="text")
+
+
+def test_explain_parameterized(db: gp.Database):
+    rows = [(i,) for i in range(10)]
+    df = db.create_dataframe(rows=rows, column_names=["id"])
+    lookup = df[lambda t: t["id"] == gp.parameter("id")]
+    plan = lookup.bind(id=3).explain(analyze=True)
+    assert plan.root.actual_rows == 1
+
+
+def test_profile_steps(db: gp.Database):
+    rows = [(i,) for i in range(10)]
+    df = db.create_dataframe(rows=rows, column_names=["id"])
+    filtered = df[lambda t: t["id"] > 5]
+    result = filtered.assign(double=lambda t: t["id"] * 2)
+    profile = result.profile()
+    assert [step.name for step in profile.steps] == [df._name, filtered._name, result._name]
+    assert [step.operation for step in profile.steps] == [
+        "create_dataframe",
+        "__getitem__",
+        "assign",
+    ]
+    assert all(__file__ in step.call_site for step in profile.steps)
+    assert profile.steps[-1].rows == 4
+    assert sum(len(step.nodes) for step in profile.steps) == len(list(profile.plan.nodes()))
+    assert sum(step.time or 0 for step in profile.steps) >= 0
+    assert "call site" in repr(profile)
+
+
+def test_profile_parameterized(db: gp.Database):
+    rows = [(i,) for i in range(10)]
+    df = db.create_dataframe(rows=rows, column_names=["id"])
+    lookup = df[lambda t: t["id"] == gp.parameter("id")].assign(double=lambda t: t["id"] * 2)
+    profile = lookup.bind(id=3).profile()
+    assert profile.steps[-1].rows == 1